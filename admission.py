@@ -0,0 +1,156 @@
+"""
+Admission Control
+Bounds the requests scored at once and degrades the service as their queue
+time grows: first to the reduced ensembles, then to NLP-only scoring, and
+finally to shedding requests with 503 and Retry-After
+"""
+
+import bisect
+import math
+import threading
+import time
+
+# Degradation levels, in order; each starts at one queue-time threshold
+NORMAL, REDUCED, NLP_ONLY, SHED = LEVELS = ('normal', 'reduced', 'nlp_only', 'shed')
+
+# WSGI environ key holding the time.monotonic() a request reached the server
+# (set by asgi.py before the request waits for an executor thread)
+ARRIVED_ENVIRON_KEY = 'admission.arrived'
+
+
+class Overloaded(Exception):
+    """Request refused without being queued (or after queueing too long)"""
+
+    def __init__(self, retry_after):
+        self.retry_after = retry_after
+        super().__init__('Service overloaded, retry later')
+
+
+class AdmissionController:
+    """
+    At most max_in_flight admitted requests; up to max_queue more wait for a slot
+
+    The degradation level follows the queue delay: a moving average of the
+    time admitted requests spent waiting, decaying over `window` seconds so
+    the service recovers once it stops admitting, or the age of the oldest
+    waiting request when that is larger. thresholds_ms are the delays at
+    which the reduced, nlp_only and shed levels begin; a request still
+    waiting at the last one is refused. Queue time runs from the request's
+    arrival when the caller knows it, so waiting outside the controller
+    (for a server thread, or in the listen socket) counts too.
+    """
+
+    def __init__(self, max_in_flight, max_queue, thresholds_ms=(50, 200, 1000), retry_after=1,
+                 window=1.0, smoothing=0.2):
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.thresholds = tuple(threshold / 1000 for threshold in thresholds_ms)
+        self.retry_after = retry_after
+        self.window = window
+        self.smoothing = smoothing
+        self._condition = threading.Condition()
+        self._in_flight = 0
+        self._waiting = []  # arrival times, oldest first
+        self._delay = 0.0
+        self._updated = time.monotonic()
+        self.admitted = 0
+        self.rejected = 0
+
+    def _queue_delay(self, now):
+        """Current queue delay estimate in seconds (lock held)"""
+        delay = self._delay * math.exp(-(now - self._updated) / self.window)
+        if self._waiting:
+            delay = max(delay, now - self._waiting[0])
+        return delay
+
+    def _observe(self, wait, now):
+        """Fold a request's queue time into the average (lock held)"""
+        delay = self._delay * math.exp(-(now - self._updated) / self.window)
+        self._delay = delay + self.smoothing * (wait - delay)
+        self._updated = now
+
+    def _level(self, now):
+        delay = self._queue_delay(now)
+        return LEVELS[sum(delay >= threshold for threshold in self.thresholds)]
+
+    def level(self):
+        """Degradation level new requests are currently served at"""
+        with self._condition:
+            return self._level(time.monotonic())
+
+    def acquire(self, arrived=None):
+        """
+        Wait for a slot and return the level to serve the request at
+
+        arrived: time.monotonic() at which the request reached the server,
+        if earlier than now. Raises Overloaded when shedding, when the queue
+        is full, or when no slot frees up before the last threshold. Every
+        successful call must be matched by release().
+        """
+        with self._condition:
+            now = time.monotonic()
+            enqueued = now if arrived is None else min(arrived, now)
+            if self._level(now) == SHED or len(self._waiting) >= self.max_queue:
+                self.rejected += 1
+                raise Overloaded(self.retry_after)
+
+            if self._in_flight >= self.max_in_flight:
+                bisect.insort(self._waiting, enqueued)
+                try:
+                    deadline = enqueued + self.thresholds[-1]
+                    while self._in_flight >= self.max_in_flight:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            self.rejected += 1
+                            self._observe(self.thresholds[-1], time.monotonic())
+                            raise Overloaded(self.retry_after)
+                        self._condition.wait(remaining)
+                finally:
+                    self._waiting.remove(enqueued)
+
+            now = time.monotonic()
+            self._in_flight += 1
+            self.admitted += 1
+            self._observe(now - enqueued, now)
+            # Admitted after all: served at the most degraded level short of shedding
+            level = self._level(now)
+            return NLP_ONLY if level == SHED else level
+
+    def release(self):
+        with self._condition:
+            self._in_flight -= 1
+            self._condition.notify()
+
+    def stats(self):
+        with self._condition:
+            now = time.monotonic()
+            return {
+                'level': self._level(now),
+                'queue_delay_ms': round(self._queue_delay(now) * 1000, 3),
+                'in_flight': self._in_flight,
+                'waiting': len(self._waiting),
+                'max_in_flight': self.max_in_flight,
+                'max_queue': self.max_queue,
+                'thresholds_ms': [threshold * 1000 for threshold in self.thresholds],
+                'admitted': self.admitted,
+                'rejected': self.rejected
+            }
+
+
+def request_start(value):
+    """
+    time.monotonic() equivalent of a proxy's X-Request-Start stamp, or None
+
+    Accepts 't=<epoch>' or a bare epoch, in seconds (nginx $msec),
+    milliseconds or microseconds.
+    """
+    try:
+        stamp = float(value.strip().removeprefix('t='))
+    except (AttributeError, ValueError):
+        return None
+    if not math.isfinite(stamp) or stamp <= 0:
+        return None
+    while stamp > 1e11:
+        stamp /= 1000
+    # A stamp from the future (clock skew) counts as arriving now
+    return time.monotonic() - max(time.time() - stamp, 0.0)
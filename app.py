@@ -1,16 +1,47 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, g, request, jsonify, stream_with_context
+from werkzeug.wsgi import get_input_stream
 from flask_cors import CORS
-import joblib
-import numpy as np
-import pandas as pd
-from sklearn.preprocessing import StandardScaler
+import contextvars
+import io
 import os
 import json
+import hmac
+import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from nlp_analyzer import ScamTextAnalyzer
+from admission import (ARRIVED_ENVIRON_KEY, LEVELS, NLP_ONLY, NORMAL, REDUCED, SHED, AdmissionController, Overloaded,
+                       request_start)
+from ensemble import EnsembleEngine
+from feature_schema import INTERNSHIP_SCHEMA, JOB_SCHEMA
+from micro_batcher import MicroBatcher
+from result_cache import LRUCache
+from synthetic_data import generate_internship_dataset, generate_job_dataset
+import profiling
+import structured_logging
+from metrics import REGISTRY, REQUESTS, REQUEST_LATENCY, TEXT_ANALYSIS_LATENCY
+from model_store import UNVERSIONED, current_version, open_model_version
+from worker_memory import memory_usage
+from config import config
 
 app = Flask(__name__)
+app.config.from_object(config[os.environ.get('FLASK_CONFIG', 'default')])
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
 
+# Structured JSON logs, written by a background thread; sampled per route
+logger, log_handler = structured_logging.configure(
+    'fraud_api',
+    level=app.config['LOG_LEVEL'],
+    queue_size=app.config['LOG_QUEUE_SIZE']
+)
+log_sampler = structured_logging.RouteSampler(app.config['LOG_SAMPLE_RATE'], app.config['LOG_SAMPLE_RATES'])
+
+def _debug_sampled():
+    """True when this request's debug records should be built and logged"""
+    return g.get('log_sampled', False) and logger.isEnabledFor(logging.DEBUG)
+
 # Enable CORS for React frontend
 CORS(app, resources={
     r"/api/*": {
@@ -23,35 +54,437 @@ CORS(app, resources={
 # Initialize NLP analyzer
 nlp_analyzer = ScamTextAnalyzer()
 
-# Load models
-def load_models():
-    models = {}
-    model_dir = 'models'
+# Resubmitted postings reuse their analysis; entries are charged their JSON size
+text_cache = LRUCache(
+    max_entries=None,
+    max_bytes=app.config['TEXT_CACHE_MAX_BYTES'],
+    sizeof=lambda analysis: len(json.dumps(analysis))
+)
+
+def _timed_analysis(text):
+    started = time.perf_counter_ns()
+    analysis = nlp_analyzer.analyze_text(text)
+    elapsed_ns = time.perf_counter_ns() - started
+    TEXT_ANALYSIS_LATENCY.observe(elapsed_ns / 1e9)
+    profiling.record('nlp', elapsed_ns)
+    return analysis
+
+def _analyze_text(text):
+    """nlp_analyzer.analyze_text, served from the content-hash cache when possible"""
+    if not app.config['TEXT_CACHE_MAX_BYTES']:
+        return _timed_analysis(text)
+    
+    with profiling.stage('text_cache'):
+        key = nlp_analyzer.content_key(text)
+        analysis = text_cache.get(key)
+    if analysis is None:
+        analysis = _timed_analysis(text)
+        text_cache.put(key, analysis)
+    # Routes add fields to the analysis, so hand out a copy
+    return dict(analysis)
+
+def _analysis_pool():
+    return ThreadPoolExecutor(
+        max_workers=app.config['ANALYSIS_POOL_SIZE'],
+        thread_name_prefix='text-analysis'
+    ) if app.config['ANALYSIS_POOL_SIZE'] else None
+
+analysis_pool = _analysis_pool()
+
+def _finished_at(stage, text):
+    """Run an analyzer stage, returning (result, perf_counter_ns at completion)"""
+    return stage(text), time.perf_counter_ns()
+
+def _start_analysis(text):
+    """
+    Begin _analyze_text(text) without waiting for it; returns a function
+    that joins the analysis
+    
+    On a cache miss the keyword scan and the text statistics run concurrently
+    on analysis_pool, under copies of the request's profiling context, while
+    the caller carries on (e.g. with the ML ensemble).
+    """
+    if analysis_pool is None:
+        analysis = _analyze_text(text)
+        return lambda: analysis
+    
+    key = None
+    if app.config['TEXT_CACHE_MAX_BYTES']:
+        with profiling.stage('text_cache'):
+            key = nlp_analyzer.content_key(text)
+            cached = text_cache.get(key)
+        if cached is not None:
+            return lambda: dict(cached)
+    
+    started = time.perf_counter_ns()
+    # A context can only be entered by one thread at a time, so each task gets its own copy
+    scan = analysis_pool.submit(contextvars.copy_context().run, _finished_at, nlp_analyzer.scan, text)
+    features = analysis_pool.submit(contextvars.copy_context().run, _finished_at, nlp_analyzer.text_features, text)
+    
+    def join():
+        (scan_result, scan_done), (features_result, features_done) = scan.result(), features.result()
+        analysis = nlp_analyzer.combine(scan_result, features_result)
+        elapsed_ns = max(scan_done, features_done) - started
+        TEXT_ANALYSIS_LATENCY.observe(elapsed_ns / 1e9)
+        profiling.record('nlp', elapsed_ns)
+        if key is not None:
+            text_cache.put(key, analysis)
+        return dict(analysis)
+    return join
+
+# Shared by every engine; keys include the model version and reloads clear it
+prediction_cache = LRUCache(app.config['PREDICTION_CACHE_SIZE'], ttl=app.config['PREDICTION_CACHE_TTL'])
+
+def _member_pool():
+    return ThreadPoolExecutor(
+        max_workers=app.config['MEMBER_POOL_SIZE'],
+        thread_name_prefix='ensemble-member'
+    ) if app.config['PARALLEL_MEMBERS'] else None
+
+# Shared across engines so a reload does not leave idle threads behind
+member_pool = _member_pool()
+
+def _cache_stat(stat):
+    """Scrape-time collector of one LRUCache statistic per cache"""
+    return lambda: {
+        ('prediction',): prediction_cache.stats()[stat],
+        ('text',): text_cache.stats()[stat]
+    }
+
+REGISTRY.register_collector('cache_hits_total', 'counter', 'Cache lookups served from the cache', ('cache',), _cache_stat('hits'))
+REGISTRY.register_collector('cache_misses_total', 'counter', 'Cache lookups that missed', ('cache',), _cache_stat('misses'))
+REGISTRY.register_collector('cache_evictions_total', 'counter', 'Entries evicted to stay within the cache bounds', ('cache',), _cache_stat('evictions'))
+REGISTRY.register_collector('cache_hit_ratio', 'gauge', 'Hits over lookups since startup', ('cache',), _cache_stat('hit_rate'))
+REGISTRY.register_collector('log_records_dropped_total', 'counter', 'Log records dropped because the log queue was full', (), lambda: {(): log_handler.dropped})
+REGISTRY.register_collector('cache_entries', 'gauge', 'Entries currently cached', ('cache',), _cache_stat('entries'))
+
+def _open_engine(version=None):
+    """Engine over a model version (CURRENT by default); models load lazily on first use"""
+    store = open_model_version(
+        app.config['MODEL_DIR'],
+        version,
+        use_compiled=app.config['USE_COMPILED_MODELS'],
+        memory_budget=app.config['MODEL_MEMORY_BUDGET'],
+        mmap_mode=app.config['MODEL_MMAP_MODE']
+    )
+    return EnsembleEngine(
+        store,
+        compiled_max_rows=app.config['COMPILED_MAX_ROWS'],
+        cache=prediction_cache if app.config['PREDICTION_CACHE_SIZE'] else None,
+        executor=member_pool,
+        cascade_bands=app.config['CASCADE_BANDS'],
+        fast_bands=app.config['FAST_BANDS']
+    )
+
+# Each request reads `engine` once and finishes on that model version;
+# a reload swaps in the new engine with a single assignment
+engine = _open_engine()
+
+# Postings per dataset generator and texts pushed through the models and the
+# text analyzer before /api/ready reports ready (the generators keep their
+# fraud shares exact for multiples of 100 postings)
+WARM_UP_SAMPLES = 100
+WARM_UP_TEXTS = [
+    'We are hiring a software engineer with 3+ years of Python experience. '
+    'Apply through our careers page; shortlisted candidates are invited to a technical interview.',
+    'URGENT!!! Work from home and earn $5000 per week, no experience needed. '
+    'Pay a registration fee via Western Union and send your bank details on WhatsApp to start today.'
+]
+
+def _warm_up_samples():
+    """Synthetic postings from the training distributions, per ensemble"""
+    jobs = generate_job_dataset(WARM_UP_SAMPLES)[JOB_SCHEMA.names].to_dict('records')
+    internships = generate_internship_dataset(WARM_UP_SAMPLES)[INTERNSHIP_SCHEMA.names].to_dict('records')
+    return {'job': jobs, 'comprehensive_job': jobs, 'internship': internships}
+
+_reload_lock = threading.Lock()
+reload_status = {'state': 'idle', 'version': engine.version, 'error': None}
+
+def reload_models(version=None):
+    """Load a model version, warm it up and swap it in for new requests"""
+    global engine
+    with _reload_lock:
+        reload_status.update(state='loading', version=version, error=None)
+        try:
+            new_engine = _open_engine(version)
+            new_engine.warm_up(_warm_up_samples())
+        except Exception as e:
+            reload_status.update(state='failed', error=str(e))
+            logger.error('Model reload failed', exc_info=True, extra={'fields': {'version': version}})
+            return False
+        
+        engine = new_engine
+        # Entries of the old version can no longer be hit; free them
+        prediction_cache.clear()
+        reload_status.update(state='idle', version=new_engine.version)
+        logger.info('Serving model version', extra={'fields': {'version': new_engine.version}})
+        return True
+
+def _watch_models(interval):
+    """Reload whenever models/CURRENT names a new version"""
+    failed_version = None
+    while True:
+        time.sleep(interval)
+        version = current_version(app.config['MODEL_DIR'])
+        if version and version not in (engine.version, failed_version) and not _reload_lock.locked():
+            failed_version = None if reload_models(version) else version
+
+def _start_watcher():
+    if app.config['MODEL_WATCH_INTERVAL']:
+        threading.Thread(target=_watch_models, args=(app.config['MODEL_WATCH_INTERVAL'],), daemon=True).start()
+
+_start_watcher()
+
+def _after_fork():
+    """
+    Restart this module's threads in a forked worker (gunicorn.conf.py preloads
+    the app in its master); a pool inherited from the parent would queue work
+    for threads that no longer exist
+    """
+    global member_pool, analysis_pool
+    member_pool = _member_pool()
+    engine.executor = member_pool
+    analysis_pool = _analysis_pool()
+    _start_watcher()
+
+os.register_at_fork(after_in_child=_after_fork)
+
+# Readiness for /api/ready: 'cold' until warm_up() starts, then 'warming',
+# 'ready' or 'failed'
+readiness = {'state': 'cold', 'warm_up_ms': None, 'error': None}
+
+def warm_up():
+    """
+    Run synthetic postings through every model of the serving engine (each
+    mode, compiled and library paths) and texts through the analyzer, so the
+    libraries' lazy initialization happens before the first request
+    """
+    readiness.update(state='warming', error=None)
+    started = time.perf_counter()
+    try:
+        active = engine
+        active.warm_up(_warm_up_samples())
+        for text in WARM_UP_TEXTS:
+            nlp_analyzer.analyze_text(text)
+    except Exception as e:
+        readiness.update(state='failed', error=str(e))
+        logger.error('Warm-up failed', exc_info=True)
+        return False
     
-    if os.path.exists(model_dir):
-        # Job Detection Models
-        job_models = ['job_xgboost', 'job_catboost', 'job_gradient_boost', 'job_random_forest', 'job_decision_tree']
-        for model in job_models:
-            model_path = os.path.join(model_dir, f'{model}.pkl')
-            if os.path.exists(model_path):
-                models[model] = joblib.load(model_path)
-        
-        # Internship Detection Models
-        internship_models = ['internship_svm', 'internship_random_forest', 'internship_xgboost']
-        for model in internship_models:
-            model_path = os.path.join(model_dir, f'{model}.pkl')
-            if os.path.exists(model_path):
-                models[model] = joblib.load(model_path)
-        
-        # Load scalers
-        if os.path.exists(os.path.join(model_dir, 'job_scaler.pkl')):
-            models['job_scaler'] = joblib.load(os.path.join(model_dir, 'job_scaler.pkl'))
-        if os.path.exists(os.path.join(model_dir, 'internship_scaler.pkl')):
-            models['internship_scaler'] = joblib.load(os.path.join(model_dir, 'internship_scaler.pkl'))
+    readiness.update(state='ready', warm_up_ms=round((time.perf_counter() - started) * 1000, 1))
+    logger.info('Ready', extra={'fields': {'version': active.version, 'warm_up_ms': readiness['warm_up_ms']}})
+    return True
+
+if app.config['WARM_UP_ON_START']:
+    # Not a daemon: exiting mid warm-up would tear down the interpreter under
+    # a thread running inside the model libraries' native code
+    threading.Thread(target=warm_up, name='warm-up').start()
+
+micro_batcher = MicroBatcher(
+    max_rows=app.config['MICRO_BATCH_MAX_ROWS'],
+    max_wait_ms=app.config['MICRO_BATCH_WAIT_MS']
+) if app.config['MICRO_BATCHING'] else None
+
+# Bounded concurrency with graceful degradation for the scoring routes
+admission = AdmissionController(
+    max_in_flight=app.config['ADMISSION_MAX_IN_FLIGHT'],
+    max_queue=app.config['ADMISSION_MAX_QUEUE'],
+    thresholds_ms=app.config['DEGRADE_QUEUE_MS'],
+    retry_after=app.config['ADMISSION_RETRY_AFTER']
+) if app.config['ADMISSION_MAX_IN_FLIGHT'] else None
+
+# Routes under admission control, and those among them with no text to score
+# once the ensembles are switched off at the nlp_only level
+_ADMITTED_ENDPOINTS = {
+    'predict_job', 'predict_internship', 'predict_job_batch', 'predict_internship_batch',
+    'score_stream', 'analyze_text', 'comprehensive_analysis'
+}
+_ML_ONLY_ENDPOINTS = {'predict_job', 'predict_internship', 'predict_job_batch', 'predict_internship_batch', 'score_stream'}
+
+if admission is not None:
+    REGISTRY.register_collector('admission_level', 'gauge', 'Degradation level (0 normal, 1 reduced, 2 nlp_only, 3 shed)', (),
+                                lambda: {(): LEVELS.index(admission.level())})
+    REGISTRY.register_collector('admission_in_flight', 'gauge', 'Requests holding a scoring slot', (),
+                                lambda: {(): admission.stats()['in_flight']})
+    REGISTRY.register_collector('admission_rejected_total', 'counter', 'Requests refused with 503 by admission control', (),
+                                lambda: {(): admission.rejected})
+
+def _degradation():
+    """Degradation level the current request was admitted at"""
+    return g.get('degradation', NORMAL)
+
+def _predict_row(active, name, features, timings=None, mode='full', deadline=None):
+    """Score a one-row feature matrix, through the micro-batcher when enabled"""
+    # A deadline-bound row is scored on its own, not held for a batch
+    if micro_batcher is not None and deadline is None:
+        # Members run on the batcher thread; the stage covers the queue wait too
+        with profiling.stage('micro_batch'):
+            return micro_batcher.predict(active, name, features[0], timings, mode)
+    return active.predict_matrix(name, features, timings, mode, deadline)[0]
+
+def _scoring_mode():
+    """Scoring mode requested with ?mode= (ENSEMBLE_MODE by default); 'reduced' while degraded"""
+    if _degradation() == REDUCED:
+        return 'reduced'
+    return request.args.get('mode', app.config['ENSEMBLE_MODE'])
+
+def _deadline():
+    """
+    time.monotonic() deadline of a request sent with a latency budget in
+    X-Deadline-Ms (or ?deadline_ms=), counted from its arrival (see
+    _arrival, else from the start of the request); else None
+    """
+    budget = request.headers.get('X-Deadline-Ms') or request.args.get('deadline_ms')
+    if budget is None:
+        return None
+    budget = float(budget)
+    if not 0 < budget < float('inf'):
+        raise ValueError('deadline_ms must be a positive number of milliseconds')
+    arrived = _arrival()
+    if arrived is None:
+        # request_started is a perf_counter() reading; carry it over to the monotonic clock
+        arrived = time.monotonic() - (time.perf_counter() - g.request_started)
+    return arrived + budget / 1000
+
+def _model_timings():
+    """Dict collecting per-member timings when MODEL_TIMINGS is on, else None"""
+    return {} if app.config['MODEL_TIMINGS'] else None
+
+def _get_postings(data):
+    """Accept either a JSON list of postings or {"postings": [...]}"""
+    if isinstance(data, dict):
+        data = data.get('postings')
+    if not isinstance(data, list):
+        raise ValueError('Expected a list of postings')
+    for index, posting in enumerate(data):
+        if not isinstance(posting, dict):
+            raise ValueError(f'Posting at index {index} is not a JSON object')
+    return data
+
+def _predict_postings(active, name, postings, timings=None, deadline=None):
+    """
+    One result per posting: valid postings are scored in one matrix, invalid
+    ones get their validation errors instead
+    """
+    features, errors = active.validated_matrix(name, postings)
+    valid = [row for row in range(len(postings)) if row not in errors]
+    results = [None] * len(postings)
+    if valid:
+        scored = active.predict_matrix(name, features[valid] if errors else features, timings, _scoring_mode(), deadline)
+        for row, result in zip(valid, scored):
+            results[row] = result
+    for row, messages in errors.items():
+        results[row] = {'success': False, 'error': 'Invalid features', 'validation_errors': messages}
+    return results, len(errors)
+
+def _timings_requested():
+    flag = request.headers.get('X-Timings') or request.args.get('timings')
+    return flag is not None and flag.lower() in ('1', 'true', 'yes')
+
+@app.before_request
+def _start_request_timer():
+    g.request_started = time.perf_counter()
+    g.log_sampled = log_sampler.sampled(request.url_rule.rule if request.url_rule else 'unmatched')
     
-    return models
+    rate = app.config['PROFILE_SAMPLE_RATE']
+    if rate and random.random() < rate:
+        g.profile = profiling.start_profile()
+    
+    if _timings_requested():
+        g.stage_token = profiling.start()
+        if request.is_json:
+            # Parse now so the route's request.json is served from the cache
+            with profiling.stage('parse'):
+                request.get_json(silent=True)
+
+def _overloaded(retry_after, level):
+    response = jsonify({
+        'success': False,
+        'error': 'Service overloaded, retry later',
+        'degradation_level': level
+    })
+    response.status_code = 503
+    response.headers['Retry-After'] = str(retry_after)
+    return response
 
-models = load_models()
+def _arrival():
+    """time.monotonic() the request reached the server, when known"""
+    arrived = request.environ.get(ARRIVED_ENVIRON_KEY)
+    if app.config['ADMISSION_REQUEST_START'] and 'X-Request-Start' in request.headers:
+        stamped = request_start(request.headers['X-Request-Start'])
+        if stamped is not None:
+            arrived = stamped if arrived is None else min(arrived, stamped)
+    return arrived
+
+@app.before_request
+def _admit_request():
+    """Hold a scoring slot for the request, or answer 503 when overloaded"""
+    if admission is None or request.method == 'OPTIONS' or request.endpoint not in _ADMITTED_ENDPOINTS:
+        return None
+    
+    try:
+        with profiling.stage('admission'):
+            level = admission.acquire(arrived=_arrival())
+    except Overloaded as e:
+        g.degradation = SHED
+        return _overloaded(e.retry_after, SHED)
+    
+    # Released in _finish_request_timer, after a streamed body is complete
+    g.admitted = True
+    g.degradation = level
+    if level == NLP_ONLY and request.endpoint in _ML_ONLY_ENDPOINTS:
+        return _overloaded(admission.retry_after, level)
+    return None
+
+@app.after_request
+def _record_request_metrics(response):
+    started = g.pop('request_started', None)
+    if started is not None:
+        # The route pattern, not the raw path, so unknown URLs share one series
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        elapsed = time.perf_counter() - started
+        REQUEST_LATENCY.observe(elapsed, route)
+        REQUESTS.inc(route, request.method, str(response.status_code))
+        
+        if g.get('log_sampled'):
+            logger.info('request', extra={'fields': {
+                'route': route,
+                'method': request.method,
+                'status': response.status_code,
+                'duration_ms': round(elapsed * 1000, 3)
+            }})
+        
+        profile = g.pop('profile', None)
+        if profile is not None:
+            profile.disable()
+            if elapsed * 1000 >= app.config['PROFILE_SLOW_MS']:
+                profiling.save_profile(profile, app.config['PROFILE_DIR'], f'{request.method}_{route}', elapsed * 1000)
+    
+    level = g.get('degradation')
+    if level is not None:
+        response.headers['X-Degradation-Level'] = level
+    
+    timer = profiling.current()
+    if timer is not None:
+        response.headers['Server-Timing'] = timer.server_timing()
+        if response.is_json and not response.is_streamed:
+            body = response.get_json()
+            if isinstance(body, dict):
+                body['timings'] = timer.as_dict()
+                response.set_data(app.json.dumps(body))
+    return response
+
+@app.teardown_request
+def _finish_request_timer(exc):
+    if g.pop('admitted', False):
+        admission.release()
+    token = g.pop('stage_token', None)
+    if token is not None:
+        profiling.finish(token)
+    profile = g.pop('profile', None)
+    if profile is not None:
+        # The request failed before after_request ran
+        profile.disable()
 
 # API Routes
 @app.route('/api/predict-job', methods=['POST'])
@@ -59,105 +492,18 @@ def predict_job():
     """Predict if job is real or fraudulent"""
     try:
         data = request.json
+        active = engine
         
-        # Extract features in the same order as training
-        features = np.array([[
-            data.get('salary_min', 0),
-            data.get('salary_max', 0),
-            data.get('company_experience_years', 0),
-            data.get('job_description_length', 0),
-            data.get('required_experience_years', 0),
-            data.get('required_education_level', 0),
-            data.get('telecommute_allowed', 0),
-            data.get('has_company_logo', 0)
-        ]])
-        
-        # Apply feature scaling using the trained scaler
-        if 'job_scaler' in models:
-            features = models['job_scaler'].transform(features)
-        else:
-            return jsonify({
-                'success': False,
-                'error': 'Job scaler not found. Please retrain models.'
-            }), 400
+        timings = _model_timings()
         
-        predictions = {}
-        
-        # XGBoost prediction
-        if 'job_xgboost' in models:
-            pred = models['job_xgboost'].predict(features)[0]
-            prob = models['job_xgboost'].predict_proba(features)[0]
-            predictions['xgboost'] = {
-                'prediction': 'Fraudulent' if pred == 1 else 'Real',
-                'confidence': float(max(prob) * 100)
-            }
-        
-        # CatBoost prediction
-        if 'job_catboost' in models:
-            pred = models['job_catboost'].predict(features)[0]
-            prob = models['job_catboost'].predict_proba(features)[0]
-            predictions['catboost'] = {
-                'prediction': 'Fraudulent' if pred == 1 else 'Real', 
-                'confidence': float(max(prob) * 100)
-            }
-        
-        # Gradient Boost prediction
-        if 'job_gradient_boost' in models:
-            pred = models['job_gradient_boost'].predict(features)[0]
-            prob = models['job_gradient_boost'].predict_proba(features)[0]
-            predictions['gradient_boost'] = {
-                'prediction': 'Fraudulent' if pred == 1 else 'Real',
-                'confidence': float(max(prob) * 100)
-            }
-        
-        # Random Forest prediction
-        if 'job_random_forest' in models:
-            pred = models['job_random_forest'].predict(features)[0]
-            prob = models['job_random_forest'].predict_proba(features)[0]
-            predictions['random_forest'] = {
-                'prediction': 'Fraudulent' if pred == 1 else 'Real',
-                'confidence': float(max(prob) * 100)
-            }
-        
-        # Decision Tree prediction
-        if 'job_decision_tree' in models:
-            pred = models['job_decision_tree'].predict(features)[0]
-            prob = models['job_decision_tree'].predict_proba(features)[0]
-            predictions['decision_tree'] = {
-                'prediction': 'Fraudulent' if pred == 1 else 'Real',
-                'confidence': float(max(prob) * 100)
-            }
-        
-        # Ensemble decision (majority vote with confidence tracking)
-        fraudulent_votes = 0
-        total_confidence = 0
-        vote_count = 0
-        
-        for model_pred in predictions.values():
-            vote_count += 1
-            if model_pred['prediction'] == 'Fraudulent':
-                fraudulent_votes += 1
-            total_confidence += model_pred['confidence']
-        
-        # Determine ensemble result
-        if vote_count > 0:
-            ensemble_prediction = 'Fraudulent' if fraudulent_votes > vote_count / 2 else 'Real'
-            ensemble_confidence = total_confidence / vote_count
-        else:
-            ensemble_prediction = 'Real'
-            ensemble_confidence = 50.0
+        result = _predict_row(active, 'job', active.feature_matrix('job', [data]), timings, _scoring_mode(), _deadline())
+        result['model_version'] = active.version
+        result['degradation_level'] = _degradation()
+        if timings is not None:
+            result['model_timings_ms'] = timings
+        result['success'] = True
         
-        return jsonify({
-            'success': True,
-            'predictions': predictions,
-            'ensemble_result': ensemble_prediction,
-            'ensemble_confidence': round(ensemble_confidence, 1),
-            'vote_breakdown': {
-                'fraudulent_votes': fraudulent_votes,
-                'real_votes': vote_count - fraudulent_votes,
-                'total_models': vote_count
-            }
-        })
+        return jsonify(result)
     
     except Exception as e:
         return jsonify({
@@ -169,126 +515,239 @@ def predict_job():
 def predict_internship():
     """Predict if internship is real or fraudulent"""
     try:
-        print("\n=== INTERNSHIP PREDICTION REQUEST ===")
         data = request.json
-        print(f"Received data: {data}")
+        if _debug_sampled():
+            logger.debug('Internship prediction request', extra={'fields': {'payload': data}})
         
         if not data:
-            print("ERROR: No JSON data received")
+            logger.warning('Internship prediction request without JSON data')
             return jsonify({
                 'success': False,
                 'error': 'No data received'
             }), 400
         
+        active = engine
+        
         # Extract features in the same order as training
-        features = np.array([[
-            data.get('company_registered', 0),
-            data.get('official_email', 0),
-            data.get('website_available', 0),
-            data.get('stipend_offered', 0),
-            data.get('stipend_amount', 0),
-            data.get('registration_fee', 0),
-            data.get('interview_process', 0),
-            data.get('duration_months', 0),
-            data.get('job_description_quality', 0),
-            data.get('social_media_presence', 0)
-        ]])
-        
-        print(f"Features before scaling: {features}")
-        
-        # Apply feature scaling using the trained scaler
-        if 'internship_scaler' in models:
-            features = models['internship_scaler'].transform(features)
-            print(f"Features after scaling: {features}")
-        else:
-            print("ERROR: Internship scaler not found")
+        features = active.feature_matrix('internship', [data])
+        if _debug_sampled():
+            logger.debug('Internship features', extra={'fields': {'features': features.tolist()}})
+        
+        # Members that still need scaled input are scaled inside the engine
+        timings = _model_timings()
+        result = _predict_row(active, 'internship', features, timings, _scoring_mode(), _deadline())
+        
+        result['model_version'] = active.version
+        result['degradation_level'] = _degradation()
+        if timings is not None:
+            result['model_timings_ms'] = timings
+        result['success'] = True
+        if _debug_sampled():
+            logger.debug('Internship prediction result', extra={'fields': {'result': result}})
+        return jsonify(result)
+    
+    except Exception as e:
+        logger.exception('Internship prediction failed')
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+
+@app.route('/api/predict-job/batch', methods=['POST'])
+def predict_job_batch():
+    """Predict a batch of job postings with one pass through each model"""
+    try:
+        postings = _get_postings(request.json)
+        
+        if not postings:
             return jsonify({
                 'success': False,
-                'error': 'Internship scaler not found. Please retrain models.'
+                'error': 'No postings provided'
             }), 400
         
-        predictions = {}
+        active = engine
+        timings = _model_timings()
+        results, invalid = _predict_postings(active, 'job', postings, timings, _deadline())
         
-        # SVM prediction
-        if 'internship_svm' in models:
-            pred = models['internship_svm'].predict(features)[0]
-            try:
-                # For SVM, use predict_proba if available
-                prob = models['internship_svm'].predict_proba(features)[0]
-                confidence = float(max(prob) * 100)
-            except:
-                # Fallback to decision function
-                decision = abs(models['internship_svm'].decision_function(features)[0])
-                confidence = float(min(100, max(50, decision * 20)))
-            
-            predictions['svm'] = {
-                'prediction': 'Fraudulent' if pred == 1 else 'Real',
-                'confidence': confidence
-            }
-        
-        # Random Forest prediction
-        if 'internship_random_forest' in models:
-            pred = models['internship_random_forest'].predict(features)[0]
-            prob = models['internship_random_forest'].predict_proba(features)[0]
-            predictions['random_forest'] = {
-                'prediction': 'Fraudulent' if pred == 1 else 'Real',
-                'confidence': float(max(prob) * 100)
-            }
-        
-        # XGBoost prediction
-        if 'internship_xgboost' in models:
-            pred = models['internship_xgboost'].predict(features)[0]
-            prob = models['internship_xgboost'].predict_proba(features)[0]
-            predictions['xgboost'] = {
-                'prediction': 'Fraudulent' if pred == 1 else 'Real',
-                'confidence': float(max(prob) * 100)
-            }
-        
-        print(f"Internship predictions: {predictions}")
-        
-        # Ensemble decision (majority vote with confidence tracking)
-        fraudulent_votes = 0
-        total_confidence = 0
-        vote_count = 0
-        
-        for model_pred in predictions.values():
-            vote_count += 1
-            if model_pred['prediction'] == 'Fraudulent':
-                fraudulent_votes += 1
-            total_confidence += model_pred['confidence']
-        
-        # Determine ensemble result
-        if vote_count > 0:
-            ensemble_prediction = 'Fraudulent' if fraudulent_votes > vote_count / 2 else 'Real'
-            ensemble_confidence = total_confidence / vote_count
-        else:
-            ensemble_prediction = 'Real'
-            ensemble_confidence = 50.0
-        
-        result = {
+        response = {
             'success': True,
-            'predictions': predictions,
-            'ensemble_result': ensemble_prediction,
-            'ensemble_confidence': round(ensemble_confidence, 1),
-            'vote_breakdown': {
-                'fraudulent_votes': fraudulent_votes,
-                'real_votes': vote_count - fraudulent_votes,
-                'total_models': vote_count
-            }
+            'count': len(results),
+            'invalid': invalid,
+            'results': results,
+            'model_version': active.version,
+            'degradation_level': _degradation()
         }
+        if timings is not None:
+            response['model_timings_ms'] = timings
+        return jsonify(response)
+    
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+
+@app.route('/api/predict-internship/batch', methods=['POST'])
+def predict_internship_batch():
+    """Predict a batch of internship postings with one pass through each model"""
+    try:
+        postings = _get_postings(request.json)
         
-        print(f"Returning internship result: {result}")
-        return jsonify(result)
+        if not postings:
+            return jsonify({
+                'success': False,
+                'error': 'No postings provided'
+            }), 400
+        
+        active = engine
+        timings = _model_timings()
+        results, invalid = _predict_postings(active, 'internship', postings, timings, _deadline())
+        
+        response = {
+            'success': True,
+            'count': len(results),
+            'invalid': invalid,
+            'results': results,
+            'model_version': active.version,
+            'degradation_level': _degradation()
+        }
+        if timings is not None:
+            response['model_timings_ms'] = timings
+        return jsonify(response)
     
     except Exception as e:
-        print(f"ERROR in internship prediction: {str(e)}")
-        import traceback
-        traceback.print_exc()
         return jsonify({
             'success': False,
             'error': str(e)
         }), 400
 
+def _read_ndjson(stream, max_line_bytes):
+    """
+    Yield (line number, posting or None, error or None) per non-blank line
+
+    Reads one line at a time; lines longer than max_line_bytes are skipped
+    without being buffered.
+    """
+    line_number = 0
+    while True:
+        line = stream.readline(max_line_bytes + 1)
+        if not line:
+            return
+        line_number += 1
+        
+        if len(line) > max_line_bytes and not line.endswith(b'\n'):
+            while line and not line.endswith(b'\n'):
+                line = stream.readline(max_line_bytes)
+            yield line_number, None, f'Line exceeds {max_line_bytes} bytes'
+            continue
+        if not line.strip():
+            continue
+        
+        try:
+            posting = json.loads(line)
+        except ValueError as e:
+            yield line_number, None, f'Invalid JSON: {e}'
+            continue
+        if not isinstance(posting, dict):
+            yield line_number, None, 'Line is not a JSON object'
+            continue
+        yield line_number, posting, None
+
+def _bulk_mode():
+    """Scoring mode of /api/score-stream: the full ensembles unless degraded"""
+    return 'reduced' if _degradation() == REDUCED else 'full'
+
+def _score_chunk(active, chunk):
+    """Score a chunk of (line number, posting, error) through the ensembles and the NLP analyzer"""
+    results = [{'line': line_number} for line_number, _, _ in chunk]
+    by_type = {'job': [], 'internship': []}
+    
+    for index, (_, posting, error) in enumerate(chunk):
+        if error is None:
+            if posting.get('id') is not None:
+                results[index]['id'] = posting['id']
+            posting_type = posting.get('type', 'job')
+            text = posting.get('text')
+            if not isinstance(posting_type, str):
+                error = f'Expected a string type, got {posting_type!r}'
+            elif posting_type not in by_type:
+                error = f'Unknown type: {posting_type}'
+            elif text is not None and not isinstance(text, str):
+                error = f'Expected a string text, got {type(text).__name__}'
+            else:
+                by_type[posting_type].append(index)
+        if error is not None:
+            results[index].update(success=False, error=error)
+    
+    for posting_type, indices in by_type.items():
+        if not indices:
+            continue
+        postings = [chunk[index][1] for index in indices]
+        try:
+            features, errors = active.validated_matrix(posting_type, postings)
+            for row, messages in errors.items():
+                results[indices[row]].update(success=False, error='Invalid features', validation_errors=messages)
+            if errors:
+                valid = [row for row in range(len(postings)) if row not in errors]
+                indices = [indices[row] for row in valid]
+                postings = [postings[row] for row in valid]
+                features = features[valid]
+            # Bulk re-scoring bypasses the caches so it cannot flush the
+            # entries interactive traffic relies on
+            scored = active.score_matrix(posting_type, features, mode=_bulk_mode()) if postings else []
+        except Exception as e:
+            for index in indices:
+                results[index].update(success=False, error=str(e))
+            continue
+        
+        for index, posting, result in zip(indices, postings, scored):
+            result['type'] = posting_type
+            try:
+                if posting.get('text'):
+                    result['nlp_analysis'] = nlp_analyzer.analyze_text(posting['text'])
+            except Exception as e:
+                results[index].update(success=False, error=str(e))
+                continue
+            results[index].update(result, success=True)
+    
+    return results
+
+@app.route('/api/score-stream', methods=['POST'])
+def score_stream():
+    """
+    Score newline-delimited JSON postings, streaming one NDJSON result per line
+
+    Each line is a posting with an optional 'type' ('job' or 'internship'),
+    'id' echoed back and 'text' run through the NLP analyzer. The body is
+    read incrementally, so MAX_CONTENT_LENGTH does not apply.
+    """
+    active = engine
+    # The request's own stream enforces MAX_CONTENT_LENGTH; read the raw input instead
+    stream = get_input_stream(request.environ, max_content_length=None)
+    if isinstance(stream, io.RawIOBase):
+        # readline() on a raw stream reads a byte at a time
+        stream = io.BufferedReader(stream, buffer_size=64 * 1024)
+    chunk_size = app.config['STREAM_CHUNK_SIZE']
+    max_line_bytes = app.config['STREAM_MAX_LINE_BYTES']
+    
+    def generate():
+        chunk = []
+        for item in _read_ndjson(stream, max_line_bytes):
+            chunk.append(item)
+            if len(chunk) >= chunk_size:
+                for result in _score_chunk(active, chunk):
+                    yield json.dumps(result) + '\n'
+                chunk = []
+        if chunk:
+            for result in _score_chunk(active, chunk):
+                yield json.dumps(result) + '\n'
+    
+    return Response(
+        stream_with_context(generate()),
+        mimetype='application/x-ndjson',
+        headers={'X-Model-Version': str(active.version)}
+    )
+
 @app.route('/api/analyze-text', methods=['POST'])
 def analyze_text():
     """Analyze job/internship text for scam indicators using NLP"""
@@ -304,10 +763,11 @@ def analyze_text():
             }), 400
         
         # Analyze text using NLP
-        analysis_result = nlp_analyzer.analyze_text(text)
+        analysis_result = _analyze_text(text)
         
         # Add analysis type
         analysis_result['analysis_type'] = analysis_type
+        analysis_result['degradation_level'] = _degradation()
         analysis_result['success'] = True
         
         return jsonify(analysis_result)
@@ -334,93 +794,80 @@ def comprehensive_analysis():
                 'error': 'No text provided'
             }), 400
         
-        # Step 1: NLP Text Analysis
-        text_analysis = nlp_analyzer.analyze_text(text)
-        
-        # Step 2: Extract features from text analysis
-        nlp_features = text_analysis['features']
-        
-        # Step 3: Combine with form data if provided
+        # Form data for the ML models, if provided
         features_dict = data.get('features', {})
         
-        # Calculate final risk score
-        nlp_risk = text_analysis['risk_score']
+        # The ML ensemble only needs len(text), not the NLP output: start the
+        # text analysis (keyword scan and text statistics) in the background,
+        # score the ensemble here and join both at the risk blend. Under
+        # overload the ensemble is reduced, then skipped (NLP-only scoring).
+        level = _degradation()
+        deadline = _deadline()
+        run_ml = features_dict and analysis_type == 'job' and level != NLP_ONLY
+        join_analysis = _start_analysis(text) if run_ml else None
         
-        # If ML features are provided, combine with NLP analysis
+        active = engine
         ml_predictions = None
-        ensemble_risk = nlp_risk
+        ml_risk = None
+        ml_skipped = None
         
-        if features_dict and analysis_type == 'job':
+        if join_analysis is not None:
             # Get ML model predictions for jobs
             try:
-                features = np.array([[
-                    features_dict.get('salary_min', 0),
-                    features_dict.get('salary_max', 0),
-                    features_dict.get('company_experience_years', 0),
-                    features_dict.get('job_description_length', len(text)),
-                    features_dict.get('required_experience_years', 0),
-                    features_dict.get('required_education_level', 2),
-                    features_dict.get('telecommute_allowed', 0),
-                    features_dict.get('has_company_logo', 1)
-                ]])
-                
-                if 'job_scaler' in models:
-                    features = models['job_scaler'].transform(features)
-                    
-                    ml_predictions = {}
-                    fraud_votes = 0
-                    total_models = 0
-                    
-                    for model_name in ['job_xgboost', 'job_catboost', 'job_random_forest']:
-                        if model_name in models:
-                            pred = models[model_name].predict(features)[0]
-                            prob = models[model_name].predict_proba(features)[0]
-                            ml_predictions[model_name.replace('job_', '')] = {
-                                'prediction': 'Fraudulent' if pred == 1 else 'Genuine',
-                                'confidence': float(max(prob) * 100)
-                            }
-                            if pred == 1:
-                                fraud_votes += 1
-                            total_models += 1
-                    
-                    # Calculate ML risk score
-                    ml_risk = (fraud_votes / total_models) * 100 if total_models > 0 else 50
-                    
-                    # Combine NLP and ML risk (weighted average)
-                    ensemble_risk = (nlp_risk * 0.6) + (ml_risk * 0.4)
-            except Exception as ml_error:
-                print(f"ML prediction error: {ml_error}")
-        
-        # Determine final category based on ensemble risk
-        if ensemble_risk >= 70:
-            final_category = 'Fake'
-            alert_level = 'danger'
-        elif ensemble_risk >= 40:
-            final_category = 'Suspicious'
-            alert_level = 'warning'
-        else:
-            final_category = 'Genuine'
-            alert_level = 'success'
+                ml_result = active.predict(
+                    'comprehensive_job', [features_dict],
+                    defaults={'job_description_length': len(text)},
+                    mode='reduced' if level == REDUCED else 'full',
+                    deadline=deadline
+                )[0]
+                ml_predictions = ml_result['predictions']
+                ml_risk = ml_result['risk']
+                # Listed whenever a deadline was given, like the predict routes
+                ml_skipped = ml_result.get('skipped_models')
+            except Exception:
+                logger.warning('ML prediction failed in comprehensive analysis', exc_info=True)
+        
+        text_analysis = join_analysis() if join_analysis is not None else _analyze_text(text)
+        nlp_risk = text_analysis['risk_score']
         
-        return jsonify({
+        # Combine NLP and ML risk (weighted average)
+        ensemble_risk = nlp_risk if ml_risk is None else (nlp_risk * 0.6) + (ml_risk * 0.4)
+        
+        with profiling.stage('recommendation'):
+            # Determine final category based on ensemble risk
+            if ensemble_risk >= 70:
+                final_category = 'Fake'
+                alert_level = 'danger'
+            elif ensemble_risk >= 40:
+                final_category = 'Suspicious'
+                alert_level = 'warning'
+            else:
+                final_category = 'Genuine'
+                alert_level = 'success'
+            recommendation = _generate_recommendation(final_category, ensemble_risk)
+        
+        response = {
             'success': True,
             'nlp_analysis': text_analysis,
             'ml_predictions': ml_predictions,
+            'model_version': active.version,
+            'degradation_level': level,
             'ensemble_risk_score': round(ensemble_risk, 1),
             'final_category': final_category,
             'alert_level': alert_level,
-            'recommendation': _generate_recommendation(final_category, ensemble_risk)
-        })
+            'recommendation': recommendation
+        }
+        if ml_skipped is not None:
+            response['ml_skipped_models'] = ml_skipped
+        return jsonify(response)
     
     except Exception as e:
-        import traceback
-        traceback.print_exc()
+        logger.exception('Comprehensive analysis failed')
         return jsonify({
             'success': False,
             'error': str(e)
         }), 400
 
-@app.route('/api/health', methods=['GET'])
 def _generate_recommendation(category, risk_score):
     """Generate actionable recommendations based on analysis"""
     recommendations = {
@@ -452,13 +899,70 @@ def _generate_recommendation(category, risk_score):
 
 @app.route('/api/health', methods=['GET'])
 def health():
+    models = engine.models
     return jsonify({
         'status': 'healthy',
+        'ready': readiness['state'] == 'ready',
+        'model_version': models.version,
+        'model_reload': reload_status,
         'models_loaded': len(models) > 0,
         'nlp_analyzer': 'active',
-        'available_models': list(models.keys())
+        'available_models': list(models.keys()),
+        'resident_models': models.resident(),
+        'resident_bytes': models.resident_bytes(),
+        'memory_budget': models.memory_budget,
+        'prediction_cache': prediction_cache.stats(),
+        'micro_batching': micro_batcher.stats() if micro_batcher is not None else None,
+        'degradation_level': admission.level() if admission is not None else NORMAL,
+        'admission': admission.stats() if admission is not None else None,
+        'worker': dict(pid=os.getpid(), memory=memory_usage()),
+        'text_cache': dict(text_cache.stats(), lexicon_version=nlp_analyzer.LEXICON_VERSION)
     })
 
+@app.route('/api/ready', methods=['GET'])
+def ready():
+    """Readiness probe: 200 once warm-up has finished, 503 until then (or if it failed)"""
+    is_ready = readiness['state'] == 'ready'
+    return jsonify(dict(readiness, ready=is_ready, model_version=engine.version)), 200 if is_ready else 503
+
+@app.route('/api/metrics', methods=['GET'])
+def metrics():
+    """Counters and latency histograms in the Prometheus text exposition format"""
+    return Response(REGISTRY.render(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/api/admin/reload', methods=['POST'])
+def admin_reload():
+    """Load a model version in the background and swap it in once warm"""
+    token = app.config['ADMIN_TOKEN']
+    if token:
+        authorized = hmac.compare_digest(request.headers.get('X-Admin-Token', ''), token)
+    else:
+        # Without a token, only an explicitly allowed localhost caller
+        authorized = app.config['ADMIN_ALLOW_LOCALHOST'] and request.remote_addr in ('127.0.0.1', '::1')
+    
+    if not authorized:
+        return jsonify({
+            'success': False,
+            'error': 'Not authorized'
+        }), 403
+    
+    if _reload_lock.locked():
+        return jsonify({
+            'success': False,
+            'error': 'A model reload is already in progress'
+        }), 409
+    
+    data = request.get_json(silent=True) or {}
+    version = data.get('version')
+    threading.Thread(target=reload_models, args=(version,), daemon=True).start()
+    
+    return jsonify({
+        'success': True,
+        'status': 'reloading',
+        'current_version': engine.version,
+        'target_version': version or current_version(app.config['MODEL_DIR']) or UNVERSIONED
+    }), 202
+
 @app.errorhandler(404)
 def not_found(error):
     return jsonify({'error': 'Not found'}), 404
@@ -474,9 +978,11 @@ if __name__ == '__main__':
     print("=" * 50)
     print("🚀 Starting Flask API Server")
     print("=" * 50)
-    print(f"API URL: http://localhost:5000/api")
-    print(f"Health Check: http://localhost:5000/api/health")
-    print(f"Models Loaded: {len(models)}")
+    print("API URL: http://localhost:5000/api")
+    print("Health Check: http://localhost:5000/api/health")
+    print("Readiness: http://localhost:5000/api/ready")
+    print(f"Model Version: {engine.version}")
+    print(f"Models Available: {len(engine.models)}")
     print("=" * 50)
     
     app.run(debug=True, host='0.0.0.0', port=5000)
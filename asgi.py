@@ -0,0 +1,216 @@
+"""
+ASGI Entry Point
+Serves the Flask API from an asyncio event loop: request bodies are received
+asynchronously, so slow or idle clients hold no thread, and only the
+CPU-bound route handling runs on a bounded thread pool
+
+Run with any ASGI server, e.g.:
+    uvicorn asgi:app --host 0.0.0.0 --port 5000
+"""
+
+import asyncio
+import io
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Read when app.py is imported; like gunicorn.conf.py, serve ProductionConfig
+# (no debug mode, sampled INFO logging) unless told otherwise
+os.environ.setdefault('FLASK_CONFIG', 'production')
+
+from admission import ARRIVED_ENVIRON_KEY
+from app import app as flask_app
+
+# Routes whose request body is read while the response streams; everything
+# else is received in full before a worker thread is taken
+STREAMING_PATHS = {'/api/score-stream'}
+
+
+class _ReceiveStream(io.RawIOBase):
+    """Blocking wsgi.input fed by ASGI http.request messages from the event loop"""
+
+    def __init__(self, receive, loop):
+        self._receive = receive
+        self._loop = loop
+        self._buffer = b''
+        self._more_body = True
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        while not self._buffer and self._more_body:
+            message = asyncio.run_coroutine_threadsafe(self._receive(), self._loop).result()
+            if message['type'] == 'http.disconnect':
+                self._more_body = False
+                break
+            self._buffer = message.get('body', b'')
+            self._more_body = message.get('more_body', False)
+
+        size = min(len(buffer), len(self._buffer))
+        buffer[:size] = self._buffer[:size]
+        self._buffer = self._buffer[size:]
+        return size
+
+
+class ASGIApp:
+    """Adapts a WSGI application to ASGI with a bounded executor for handlers"""
+
+    def __init__(self, wsgi_app, max_workers=None, max_body_bytes=None):
+        self.wsgi_app = wsgi_app
+        self.max_body_bytes = max_body_bytes
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='asgi-handler')
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+        elif scope['type'] == 'http':
+            await self._http(scope, receive, send)
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                self.executor.shutdown(wait=False)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def _http(self, scope, receive, send):
+        loop = asyncio.get_running_loop()
+
+        if scope['path'] in STREAMING_PATHS:
+            body = _ReceiveStream(receive, loop)
+            await loop.run_in_executor(self.executor, self._run_streaming, scope, body, send, loop, time.monotonic())
+            return
+
+        body = await self._read_body(scope, receive)
+        if body is None:
+            await self._send_response(send, '413 Request Entity Too Large', [
+                ('Content-Type', 'application/json')
+            ], [b'{"error": "Request entity too large"}'])
+            return
+
+        # Stamped before waiting for a thread, so admission control sees that wait
+        status, headers, chunks = await loop.run_in_executor(
+            self.executor, self._run, scope, io.BytesIO(body), time.monotonic()
+        )
+        await self._send_response(send, status, headers, chunks)
+
+    async def _read_body(self, scope, receive):
+        """Whole request body, or None once it exceeds max_body_bytes"""
+        declared = dict(scope['headers']).get(b'content-length')
+        if self.max_body_bytes is not None and declared and int(declared) > self.max_body_bytes:
+            return None
+
+        chunks = []
+        size = 0
+        while True:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                break
+            chunk = message.get('body', b'')
+            size += len(chunk)
+            if self.max_body_bytes is not None and size > self.max_body_bytes:
+                return None
+            chunks.append(chunk)
+            if not message.get('more_body', False):
+                break
+        return b''.join(chunks)
+
+    def _environ(self, scope, body, arrived):
+        server = scope.get('server') or ('localhost', 80)
+        client = scope.get('client') or ('', 0)
+        environ = {
+            'REQUEST_METHOD': scope['method'],
+            'SCRIPT_NAME': scope.get('root_path', '').encode('utf-8').decode('latin-1'),
+            'PATH_INFO': scope['path'].encode('utf-8').decode('latin-1'),
+            'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+            'SERVER_NAME': server[0],
+            'SERVER_PORT': str(server[1]),
+            'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+            'REMOTE_ADDR': client[0],
+            'REMOTE_PORT': str(client[1]),
+            'wsgi.version': (1, 0),
+            'wsgi.url_scheme': scope.get('scheme', 'http'),
+            'wsgi.input': body,
+            'wsgi.input_terminated': True,
+            'wsgi.errors': sys.stderr,
+            'wsgi.multithread': True,
+            'wsgi.multiprocess': False,
+            'wsgi.run_once': False,
+            ARRIVED_ENVIRON_KEY: arrived
+        }
+        for name, value in scope['headers']:
+            name = name.decode('latin-1').upper().replace('-', '_')
+            value = value.decode('latin-1')
+            if name == 'CONTENT_TYPE' or name == 'CONTENT_LENGTH':
+                environ[name] = value
+            else:
+                key = f'HTTP_{name}'
+                environ[key] = f'{environ[key]},{value}' if key in environ else value
+        return environ
+
+    def _run(self, scope, body, arrived):
+        """Call the WSGI app in a worker thread and collect the whole response"""
+        response = {}
+
+        def start_response(status, headers, exc_info=None):
+            response['status'] = status
+            response['headers'] = headers
+
+        result = self.wsgi_app(self._environ(scope, body, arrived), start_response)
+        try:
+            chunks = [chunk for chunk in result if chunk]
+        finally:
+            if hasattr(result, 'close'):
+                result.close()
+        return response['status'], response['headers'], chunks
+
+    def _run_streaming(self, scope, body, send, loop, arrived):
+        """Call the WSGI app in a worker thread, forwarding each chunk as it is produced"""
+        response = {}
+
+        def start_response(status, headers, exc_info=None):
+            response['status'] = status
+            response['headers'] = headers
+
+        def forward(message):
+            asyncio.run_coroutine_threadsafe(send(message), loop).result()
+
+        result = self.wsgi_app(self._environ(scope, body, arrived), start_response)
+        try:
+            forward(self._start_message(response['status'], response['headers']))
+            for chunk in result:
+                if chunk:
+                    forward({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+            forward({'type': 'http.response.body', 'body': b'', 'more_body': False})
+        finally:
+            if hasattr(result, 'close'):
+                result.close()
+
+    @staticmethod
+    def _start_message(status, headers):
+        return {
+            'type': 'http.response.start',
+            'status': int(status.split(' ', 1)[0]),
+            'headers': [(name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in headers]
+        }
+
+    async def _send_response(self, send, status, headers, chunks):
+        await send(self._start_message(status, headers))
+        await send({'type': 'http.response.body', 'body': b''.join(chunks), 'more_body': False})
+
+
+app = ASGIApp(
+    flask_app,
+    max_workers=flask_app.config['ASGI_WORKER_THREADS'],
+    max_body_bytes=flask_app.config['MAX_CONTENT_LENGTH']
+)
+
+
+if __name__ == '__main__':
+    import uvicorn
+    uvicorn.run(app, host='0.0.0.0', port=5000)
@@ -0,0 +1,112 @@
+"""
+Cascade Benchmark
+Accuracy versus mean per-posting latency of the full ensembles, the
+cascade (early-exit) mode and the distilled fast mode, measured on the held-out split of the datasets
+written by train_models.py
+
+Usage:
+    python benchmark_cascade.py
+    python benchmark_cascade.py --ensemble job --first gradient_boost decision_tree --bands 0.1:0.9 0.2:0.8
+"""
+
+import argparse
+import copy
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+from sklearn.model_selection import train_test_split
+
+from config import Config
+from ensemble import ENSEMBLES, EnsembleEngine
+from model_store import open_model_version
+
+DATASETS = {
+    'job': 'jobs_dataset.csv',
+    'internship': 'internships_dataset.csv'
+}
+
+
+def held_out_split(path, features):
+    """Test split of a dataset CSV, split exactly as in train_models.py"""
+    df = pd.read_csv(path)
+    X = df.drop('label', axis=1)
+    y = df['label']
+    _, X_test, _, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+    return X_test[features].to_numpy(dtype=float), y_test.to_numpy()
+
+
+def run(engine, name, X, mode, repeat):
+    """(fraud predictions, mean seconds per posting) scoring one posting per call, like the API"""
+    rows = [X[i:i + 1] for i in range(len(X))]
+    engine.score_matrix(name, rows[0], mode=mode)  # warm up
+
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        results = [engine.score_matrix(name, row, mode=mode)[0] for row in rows]
+        elapsed = (time.perf_counter() - started) / len(rows)
+        best = elapsed if best is None else min(best, elapsed)
+
+    positive = ENSEMBLES[name]['labels'][1]
+    fraud = np.array([result['ensemble_result'] == positive for result in results])
+    escalated = [result[mode]['escalated'] for result in results if mode in result]
+    return fraud, best, (float(np.mean(escalated)) if escalated else None)
+
+
+def parse_band(text):
+    low, high = text.split(':')
+    return float(low), float(high)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark cascade and fast modes against the full ensembles')
+    parser.add_argument('--ensemble', choices=sorted(DATASETS), action='append', help='Ensemble(s) to benchmark (default: all)')
+    parser.add_argument('--first', nargs='+', help='First-stage member key(s) to try (default: the registry setting)')
+    parser.add_argument('--bands', nargs='+', type=parse_band, default=[(0.05, 0.95), (0.1, 0.9), (0.2, 0.8), (0.3, 0.7)],
+                        help='Escalation bands as low:high')
+    parser.add_argument('--repeat', type=int, default=3, help='Timing repetitions (best is reported)')
+    parser.add_argument('--model-dir', default=Config.MODEL_DIR)
+    parser.add_argument('--model-version', help='Model version (default: models/CURRENT)')
+    args = parser.parse_args(argv)
+
+    store = open_model_version(args.model_dir, args.model_version, use_compiled=Config.USE_COMPILED_MODELS)
+    print(f"Model version: {store.version}")
+
+    for name in args.ensemble or sorted(DATASETS):
+        X, y = held_out_split(DATASETS[name], ENSEMBLES[name]['schema'].names)
+        print("\n" + "=" * 78)
+        print(f"{ENSEMBLES[name]['title']} ensemble - {len(X)} held-out postings")
+        print("=" * 78)
+        print(f"{'mode':<34}{'accuracy':>10}{'agreement':>11}{'escalated':>11}{'mean ms':>10}")
+
+        engine = EnsembleEngine(store, compiled_max_rows=Config.COMPILED_MAX_ROWS)
+        full_fraud, full_time, _ = run(engine, name, X, 'full', args.repeat)
+        print(f"{'full':<34}{np.mean(full_fraud == y):>10.4f}{1.0:>11.4f}{'-':>11}{full_time * 1000:>10.3f}")
+
+        for first in args.first or [ENSEMBLES[name]['cascade']['first']]:
+            registry = copy.deepcopy(ENSEMBLES)
+            registry[name]['cascade']['first'] = first
+            for band in args.bands:
+                engine = EnsembleEngine(store, registry=registry, compiled_max_rows=Config.COMPILED_MAX_ROWS,
+                                        cascade_bands={name: band})
+                fraud, elapsed, escalated = run(engine, name, X, 'cascade', args.repeat)
+                label = f"cascade {first} [{band[0]:g}, {band[1]:g}]"
+                print(f"{label:<34}{np.mean(fraud == y):>10.4f}{np.mean(fraud == full_fraud):>11.4f}"
+                      f"{escalated:>11.1%}{elapsed * 1000:>10.3f}")
+
+        if ENSEMBLES[name]['fast']['model'] not in store:
+            print("fast: student model not found, retrain to benchmark it")
+            continue
+        for band in args.bands:
+            engine = EnsembleEngine(store, compiled_max_rows=Config.COMPILED_MAX_ROWS, fast_bands={name: band})
+            fraud, elapsed, escalated = run(engine, name, X, 'fast', args.repeat)
+            label = f"fast [{band[0]:g}, {band[1]:g}]"
+            print(f"{label:<34}{np.mean(fraud == y):>10.4f}{np.mean(fraud == full_fraud):>11.4f}"
+                  f"{escalated:>11.1%}{elapsed * 1000:>10.3f}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
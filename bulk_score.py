@@ -0,0 +1,240 @@
+"""
+Offline Bulk Scoring
+Scores CSV dumps (e.g. jobs_dataset.csv / internships_dataset.csv written by
+train_models.py) through the same ensembles and NLP analyzer as app.py,
+sharding chunks across a process pool and writing results incrementally
+
+Usage:
+    python bulk_score.py jobs_dataset.csv -o jobs_scored.csv
+    python bulk_score.py internships_dataset.csv -o scored.parquet --workers 8
+    python bulk_score.py postings.csv --type job --text-column description
+"""
+
+import argparse
+import functools
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import pandas as pd
+
+from config import Config
+from ensemble import ENSEMBLES, EnsembleEngine
+from model_store import open_model_version
+
+# Per-process state, created once by _init_worker
+_engine = None
+_nlp_analyzer = None
+
+
+def _single_threaded(model):
+    """Pin an estimator that runs its own thread pool to one thread"""
+    module = type(model).__module__.split('.')[0]
+    if module == 'xgboost':
+        # Also sets nthread on the loaded booster
+        model.set_params(n_jobs=1)
+    elif module == 'catboost':
+        # CatBoost ignores the model's thread_count when predicting and
+        # defaults to every core, so the limit goes on each call
+        model.predict_proba = functools.partial(model.predict_proba, thread_count=1)
+    return model
+
+
+def _init_worker(model_dir, version, compiled_max_rows, use_text, single_thread):
+    """Load the model version (and NLP analyzer) once per worker process"""
+    global _engine, _nlp_analyzer
+    on_load = None
+    if single_thread:
+        # One process per core; keep the BLAS/OpenMP runtimes (threadpoolctl)
+        # and the XGBoost/CatBoost thread pools from each starting a thread
+        # per core as well
+        from threadpoolctl import threadpool_limits
+        threadpool_limits(1)
+        on_load = _single_threaded
+
+    store = open_model_version(model_dir, version, use_compiled=Config.USE_COMPILED_MODELS,
+                               mmap_mode=Config.MODEL_MMAP_MODE, on_load=on_load)
+    _engine = EnsembleEngine(store, compiled_max_rows=compiled_max_rows)
+    if use_text:
+        from nlp_analyzer import ScamTextAnalyzer
+        _nlp_analyzer = ScamTextAnalyzer()
+
+
+def flatten_result(result):
+    """One flat row of output columns for an ensemble result"""
+    row = {
+        'ensemble_result': result['ensemble_result'],
+        'ensemble_confidence': result['ensemble_confidence'],
+        'fraudulent_votes': result['vote_breakdown']['fraudulent_votes'],
+        'total_models': result['vote_breakdown']['total_models']
+    }
+    for key, prediction in result['predictions'].items():
+        row[f'{key}_prediction'] = prediction['prediction']
+        row[f'{key}_confidence'] = prediction['confidence']
+    return row
+
+
+def flatten_analysis(analysis):
+    """Output columns for a ScamTextAnalyzer.analyze_text result"""
+    return {
+        'nlp_risk_score': analysis['risk_score'],
+        'nlp_category': analysis['category'],
+        'nlp_credibility_score': analysis['credibility_score'],
+        'nlp_scam_indicators': json.dumps(analysis['scam_indicators'])
+    }
+
+
+def score_chunk(chunk, ensemble, text_column=None):
+    """Score a DataFrame chunk in the current worker, returning the input with result columns appended"""
+    # Empty cells are missing values and take the schema defaults
+    postings = chunk.astype(object).where(chunk.notna(), None).to_dict('records')
+    features, errors = _engine.validated_matrix(ensemble, postings)
+    valid = [row for row in range(len(postings)) if row not in errors]
+    rows = [{'validation_error': '; '.join(errors[row])} if row in errors else None for row in range(len(postings))]
+    if valid:
+        for row, result in zip(valid, _engine.score_matrix(ensemble, features[valid] if errors else features)):
+            rows[row] = dict(flatten_result(result), validation_error=None)
+
+    if text_column:
+        for row, posting in zip(rows, postings):
+            text = posting.get(text_column)
+            if isinstance(text, str) and text:
+                row.update(flatten_analysis(_nlp_analyzer.analyze_text(text)))
+
+    scored = pd.DataFrame(rows, index=chunk.index)
+    return pd.concat([chunk, scored], axis=1)
+
+
+def detect_ensemble(columns):
+    """Ensemble whose feature columns all appear in the CSV header"""
+    for name in ('internship', 'job'):
+        if all(feature in columns for feature in ENSEMBLES[name]['schema'].names):
+            return name
+    return None
+
+
+class ResultWriter:
+    """Append scored chunks to a CSV file or, for .parquet, a Parquet file"""
+
+    def __init__(self, path):
+        self.path = path
+        self.columnar = path.endswith('.parquet')
+        self._parquet = None
+        self._columns = None
+
+    def write(self, frame):
+        if self.columnar:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            table = pa.Table.from_pandas(frame, preserve_index=False)
+            if self._parquet is None:
+                self._parquet = pq.ParquetWriter(self.path, table.schema)
+            self._parquet.write_table(table.cast(self._parquet.schema))
+        elif self._columns is None:
+            self._columns = list(frame.columns)
+            frame.to_csv(self.path, mode='w', index=False)
+        else:
+            # Keep appended rows aligned with the header even if a chunk lacks a column
+            frame.reindex(columns=self._columns).to_csv(self.path, mode='a', header=False, index=False)
+
+    def close(self):
+        if self._parquet is not None:
+            self._parquet.close()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Score a CSV of job or internship postings offline')
+    parser.add_argument('input', help='CSV file with one posting per row')
+    parser.add_argument('-o', '--output', help='Output file (.csv or .parquet); default <input>_scored.csv')
+    parser.add_argument('--type', choices=['job', 'internship'], help='Ensemble to use; detected from the header by default')
+    parser.add_argument('--text-column', help='Column of posting text to run through the NLP analyzer')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='Worker processes (default: all cores)')
+    parser.add_argument('--chunk-size', type=int, default=10000, help='Rows per chunk sent to a worker')
+    parser.add_argument('--model-dir', default=Config.MODEL_DIR, help='Model root directory')
+    parser.add_argument('--model-version', help='Model version to use (default: models/CURRENT)')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    output = args.output or f'{os.path.splitext(args.input)[0]}_scored.csv'
+
+    if output.endswith('.parquet'):
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            print('Parquet output requires pyarrow: pip install pyarrow', file=sys.stderr)
+            return 1
+
+    header = pd.read_csv(args.input, nrows=0).columns
+    ensemble = args.type or detect_ensemble(header)
+    if ensemble is None:
+        print('Could not detect the posting type from the CSV header; pass --type', file=sys.stderr)
+        return 1
+    if args.text_column and args.text_column not in header:
+        print(f'Column {args.text_column!r} not found in {args.input}', file=sys.stderr)
+        return 1
+
+    workers = max(1, args.workers)
+    print(f'Scoring {args.input} with the {ensemble} ensemble on {workers} worker(s) -> {output}')
+
+    writer = ResultWriter(output)
+    pool = ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(args.model_dir, args.model_version, Config.COMPILED_MAX_ROWS, bool(args.text_column), workers > 1)
+    )
+
+    started = time.perf_counter()
+    rows_done = 0
+    next_chunk = 0
+    finished = {}
+    pending = set()
+    chunks = enumerate(pd.read_csv(args.input, chunksize=args.chunk_size))
+
+    def report():
+        elapsed = time.perf_counter() - started
+        rate = rows_done / elapsed if elapsed > 0 else 0.0
+        print(f'\r  {rows_done:,} rows scored ({rate:,.0f} rows/sec)', end='', file=sys.stderr, flush=True)
+
+    try:
+        exhausted = False
+        while pending or not exhausted:
+            # At most two chunks per worker in flight or waiting to be
+            # written in order, so memory stays bounded
+            while not exhausted and len(pending) + len(finished) < workers * 2:
+                item = next(chunks, None)
+                if item is None:
+                    exhausted = True
+                    break
+                index, chunk = item
+                future = pool.submit(score_chunk, chunk, ensemble, args.text_column)
+                future.chunk_index = index
+                pending.add(future)
+
+            if not pending:
+                break
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                finished[future.chunk_index] = future.result()
+
+            # Write in input order
+            while next_chunk in finished:
+                frame = finished.pop(next_chunk)
+                writer.write(frame)
+                rows_done += len(frame)
+                next_chunk += 1
+                report()
+    finally:
+        pool.shutdown(cancel_futures=True)
+        writer.close()
+
+    elapsed = time.perf_counter() - started
+    print(f'\nDone: {rows_done:,} rows in {elapsed:.1f}s ({rows_done / elapsed if elapsed else 0:,.0f} rows/sec)')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
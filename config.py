@@ -14,6 +14,113 @@ class Config:
     MODEL_DIR = 'models'
     DATASET_DIR = '.'
     
+    # Compiled tree ensembles (models/compiled/) serve requests of up to
+    # COMPILED_MAX_ROWS rows; larger batches use the library estimators
+    USE_COMPILED_MODELS = True
+    COMPILED_MAX_ROWS = 32
+    
+    # Models load on first use; compiled forests are memory-mapped so worker
+    # processes share their pages. Past the budget (bytes, None = unlimited)
+    # the least recently used models are evicted.
+    MODEL_MEMORY_BUDGET = int(os.environ['MODEL_MEMORY_BUDGET']) if os.environ.get('MODEL_MEMORY_BUDGET') else None
+    MODEL_MMAP_MODE = 'r'
+    
+    # Hot reload: poll models/CURRENT every MODEL_WATCH_INTERVAL seconds
+    # (0 = off); POST /api/admin/reload requires X-Admin-Token matching
+    # ADMIN_TOKEN and is refused while it is unset. ADMIN_ALLOW_LOCALHOST=1
+    # instead admits any 127.0.0.1/::1 caller; never set it behind a reverse
+    # proxy on the same host, where every client appears as localhost.
+    MODEL_WATCH_INTERVAL = float(os.environ.get('MODEL_WATCH_INTERVAL', 0))
+    ADMIN_TOKEN = os.environ.get('ADMIN_TOKEN')
+    ADMIN_ALLOW_LOCALHOST = os.environ.get('ADMIN_ALLOW_LOCALHOST', '0') == '1'
+    
+    # Run the members of an ensemble concurrently on a shared pool of
+    # MEMBER_POOL_SIZE threads instead of one after another
+    PARALLEL_MEMBERS = os.environ.get('PARALLEL_MEMBERS', '0') == '1'
+    MEMBER_POOL_SIZE = int(os.environ.get('MEMBER_POOL_SIZE', 4))
+    
+    # Scoring mode when a request has no ?mode=: 'full' runs every member,
+    # 'cascade' runs the registry's first-stage member and escalates only
+    # postings inside its uncertainty band (see benchmark_cascade.py).
+    # CASCADE_BANDS overrides the band per ensemble, e.g. {'job': (0.2, 0.8)}.
+    # 'fast' runs the distilled student model trained by train_models.py and
+    # escalates only postings inside FAST_BANDS (same format) to the ensemble.
+    ENSEMBLE_MODE = os.environ.get('ENSEMBLE_MODE', 'full')
+    CASCADE_BANDS = {}
+    FAST_BANDS = {}
+    
+    # Coalesce concurrent /api/predict-job and /api/predict-internship calls
+    # into one matrix: wait up to MICRO_BATCH_WAIT_MS for up to
+    # MICRO_BATCH_MAX_ROWS rows (0 ms only batches requests that queued up
+    # while the previous batch was scoring)
+    MICRO_BATCHING = os.environ.get('MICRO_BATCHING', '0') == '1'
+    MICRO_BATCH_MAX_ROWS = int(os.environ.get('MICRO_BATCH_MAX_ROWS', 32))
+    MICRO_BATCH_WAIT_MS = float(os.environ.get('MICRO_BATCH_WAIT_MS', 2))
+    
+    # /api/score-stream: postings scored per chunk and the longest accepted line
+    STREAM_CHUNK_SIZE = 512
+    STREAM_MAX_LINE_BYTES = 1024 * 1024
+    
+    # asgi.py: threads running route handlers (connections themselves are
+    # handled on the event loop and need no thread)
+    ASGI_WORKER_THREADS = int(os.environ.get('ASGI_WORKER_THREADS', 8))
+    
+    # Add each member's wall time (ms) to prediction responses
+    MODEL_TIMINGS = os.environ.get('MODEL_TIMINGS', '0') == '1'
+    
+    # Stage timings: requests sent with X-Timings: 1 (or ?timings=1) get a
+    # `timings` block (ns per stage) and a Server-Timing header. A
+    # PROFILE_SAMPLE_RATE share of requests run under cProfile; those slower
+    # than PROFILE_SLOW_MS are written to PROFILE_DIR.
+    PROFILE_SAMPLE_RATE = float(os.environ.get('PROFILE_SAMPLE_RATE', 0))
+    PROFILE_SLOW_MS = float(os.environ.get('PROFILE_SLOW_MS', 250))
+    PROFILE_DIR = os.environ.get('PROFILE_DIR', 'profiles')
+    
+    # /api/comprehensive-analysis runs the keyword scan and text statistics
+    # on a pool of ANALYSIS_POOL_SIZE threads while the request thread scores
+    # the ML ensemble (0 = run them one after another)
+    ANALYSIS_POOL_SIZE = int(os.environ.get('ANALYSIS_POOL_SIZE', 8))
+    
+    # Admission control for the scoring routes (per process): at most
+    # ADMISSION_MAX_IN_FLIGHT requests are scored at once (0 = off) and up to
+    # ADMISSION_MAX_QUEUE more wait for a slot. As the smoothed queue time
+    # passes each of DEGRADE_QUEUE_MS (ms), requests are served by the
+    # reduced ensembles, then by the NLP analyzer alone (routes without text
+    # answer 503), then refused with 503 and Retry-After: ADMISSION_RETRY_AFTER.
+    # Queue time (like an X-Deadline-Ms budget) runs from arrival: from
+    # asgi.py's stamp before a request waits for a handler thread, or, with
+    # ADMISSION_REQUEST_START=1, from the X-Request-Start stamp of a trusted
+    # proxy (the only way to see the wait in the listen socket of sync
+    # gunicorn workers; see gunicorn.conf.py).
+    ADMISSION_MAX_IN_FLIGHT = int(os.environ.get('ADMISSION_MAX_IN_FLIGHT', 16))
+    ADMISSION_MAX_QUEUE = int(os.environ.get('ADMISSION_MAX_QUEUE', 64))
+    DEGRADE_QUEUE_MS = (50, 200, 1000)
+    ADMISSION_RETRY_AFTER = 1
+    ADMISSION_REQUEST_START = os.environ.get('ADMISSION_REQUEST_START', '0') == '1'
+    
+    # Warm up every model and the text analyzer on a background thread when
+    # app.py is imported; /api/ready answers 503 until it has finished.
+    # gunicorn.conf.py turns this off and warms the master before forking.
+    WARM_UP_ON_START = os.environ.get('WARM_UP_ON_START', '1') == '1'
+    
+    # Per-posting prediction cache (entries, 0 = off) and entry lifetime in seconds
+    PREDICTION_CACHE_SIZE = 10000
+    PREDICTION_CACHE_TTL = 300
+    
+    # analyze_text results cached by content hash, bounded by their
+    # serialized size (bytes, 0 = off)
+    TEXT_CACHE_MAX_BYTES = 32 * 1024 * 1024
+    
+    # Structured logging: JSON lines written by a background thread from a
+    # queue of LOG_QUEUE_SIZE records (dropped when full, never blocking a
+    # request). A request is logged with probability LOG_SAMPLE_RATES[route]
+    # (LOG_SAMPLE_RATE for other routes); at DEBUG, sampled requests also log
+    # their payloads, features and results.
+    LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO')
+    LOG_QUEUE_SIZE = 10000
+    LOG_SAMPLE_RATE = float(os.environ.get('LOG_SAMPLE_RATE', 1.0))
+    LOG_SAMPLE_RATES = {}
+    
     # Flask settings
     SECRET_KEY = os.environ.get('SECRET_KEY', 'dev-secret-key-change-in-production')
 
@@ -21,6 +128,7 @@ class DevelopmentConfig(Config):
     """Development configuration"""
     DEBUG = True
     TESTING = False
+    LOG_LEVEL = os.environ.get('LOG_LEVEL', 'DEBUG')
     HOST = '0.0.0.0'
     PORT = 5000
 
@@ -33,8 +141,23 @@ class ProductionConfig(Config):
     """Production configuration"""
     DEBUG = False
     TESTING = False
+    LOG_SAMPLE_RATE = float(os.environ.get('LOG_SAMPLE_RATE', 0.01))
     SECRET_KEY = os.environ.get('SECRET_KEY')  # Must be set in production
     
+    # Pre-fork server (gunicorn -c gunicorn.conf.py app:app): WORKERS processes
+    # of WORKER_THREADS threads forked from a master holding the loaded models.
+    # A worker is recycled gracefully after WORKER_MAX_REQUESTS requests (plus
+    # up to WORKER_MAX_REQUESTS_JITTER, 0 = never) and the master logs every
+    # worker's memory each WORKER_MEMORY_REPORT_INTERVAL seconds (0 = off).
+    BIND = os.environ.get('BIND', '0.0.0.0:5000')
+    WORKERS = int(os.environ.get('WORKERS', os.cpu_count() or 1))
+    WORKER_THREADS = int(os.environ.get('WORKER_THREADS', 1))
+    WORKER_TIMEOUT = 60
+    WORKER_GRACEFUL_TIMEOUT = 30
+    WORKER_MAX_REQUESTS = int(os.environ.get('WORKER_MAX_REQUESTS', 10000))
+    WORKER_MAX_REQUESTS_JITTER = 1000
+    WORKER_MEMORY_REPORT_INTERVAL = float(os.environ.get('WORKER_MEMORY_REPORT_INTERVAL', 60))
+    
 config = {
     'development': DevelopmentConfig,
     'testing': TestingConfig,
@@ -0,0 +1,676 @@
+"""
+Model Registry and Ensemble Engine
+Declares every served ensemble (members, feature order, scaler and vote rule)
+and scores postings with a single predict_proba call per member model
+"""
+
+import os
+import time
+from concurrent.futures import wait
+import joblib
+import numpy as np
+
+import profiling
+from feature_schema import INTERNSHIP_SCHEMA, JOB_SCHEMA, FeatureValidationError
+from metrics import MODEL_LATENCY, MODEL_ROWS, SCALER_LATENCY
+from tree_compiler import CompiledForest
+
+# Sub-directory of the model directory holding compiled tree ensembles
+COMPILED_DIR = 'compiled'
+
+# Ensemble registry
+#   schema:   FeatureSchema (feature order, defaults and ranges) of the scaler and the models
+#   defaults: per-feature overrides of the schema defaults
+#   scaler:   scaler artifact applied before the members
+#   members:  (response key, model artifact) pairs, in response order
+#   vote:     name of the rule in VOTE_RULES combining member outputs
+#   labels:   (negative, positive) prediction labels used in responses
+#   cascade:  optional early-exit mode: the `first` member scores every row and
+#             only rows whose fraud probability lies inside `band` (low, high)
+#             run the remaining members
+#   fast:     optional distilled mode: the student `model` (trained by
+#             train_models.py to mimic the ensemble's vote) scores every row and
+#             rows whose fraud probability lies inside `band` run the full ensemble
+#   reduced:  optional member keys voting in 'reduced' mode, the cheap subset
+#             served while the API is overloaded (see admission.py)
+#   lookup:   optional LookupTable artifact (see lookup_table.py) holding exact
+#             full-mode results for postings on a grid of common feature values
+ENSEMBLES = {
+    'job': {
+        'title': 'Job',
+        'schema': JOB_SCHEMA,
+        'defaults': {},
+        'scaler': 'job_scaler',
+        'members': [
+            ('xgboost', 'job_xgboost'),
+            ('catboost', 'job_catboost'),
+            ('gradient_boost', 'job_gradient_boost'),
+            ('random_forest', 'job_random_forest'),
+            ('decision_tree', 'job_decision_tree')
+        ],
+        'vote': 'majority',
+        'labels': ('Real', 'Fraudulent'),
+        'cascade': {'first': 'gradient_boost', 'band': (0.2, 0.8)},
+        'fast': {'model': 'job_student', 'band': (0.3, 0.7)},
+        'reduced': ['xgboost', 'gradient_boost', 'decision_tree']
+    },
+    'internship': {
+        'title': 'Internship',
+        'schema': INTERNSHIP_SCHEMA,
+        'defaults': {},
+        'scaler': 'internship_scaler',
+        'members': [
+            ('svm', 'internship_svm'),
+            ('random_forest', 'internship_random_forest'),
+            ('xgboost', 'internship_xgboost')
+        ],
+        'vote': 'majority',
+        'labels': ('Real', 'Fraudulent'),
+        'cascade': {'first': 'xgboost', 'band': (0.1, 0.9)},
+        'fast': {'model': 'internship_student', 'band': (0.3, 0.7)},
+        'reduced': ['xgboost'],
+        'lookup': 'internship_lookup'
+    },
+    # ML half of /api/comprehensive-analysis
+    'comprehensive_job': {
+        'title': 'Job',
+        'schema': JOB_SCHEMA,
+        'defaults': {'required_education_level': 2, 'has_company_logo': 1},
+        'scaler': 'job_scaler',
+        'members': [
+            ('xgboost', 'job_xgboost'),
+            ('catboost', 'job_catboost'),
+            ('random_forest', 'job_random_forest')
+        ],
+        'vote': 'fraud_share',
+        'labels': ('Genuine', 'Fraudulent'),
+        'reduced': ['xgboost', 'catboost']
+    }
+}
+
+
+def registered_artifacts(registry=None):
+    """Names of every model and scaler artifact referenced by the registry"""
+    registry = registry or ENSEMBLES
+    names = []
+    for spec in registry.values():
+        model_names = [model_name for _, model_name in spec['members']]
+        if 'fast' in spec:
+            model_names.append(spec['fast']['model'])
+        if 'lookup' in spec:
+            model_names.append(spec['lookup'])
+        for model_name in model_names:
+            if model_name not in names:
+                names.append(model_name)
+    for spec in registry.values():
+        if spec['scaler'] not in names:
+            names.append(spec['scaler'])
+    return names
+
+
+def compiled_key(name):
+    """Key (and path relative to the model directory) of a compiled artifact"""
+    return f'{COMPILED_DIR}/{name}'
+
+
+def load_models(model_dir='models', registry=None, use_compiled=True):
+    """
+    Load every artifact referenced by the registry that exists on disk
+
+    Compiled tree ensembles exported by train_models.py are loaded alongside
+    the library estimators under compiled_key(name).
+    """
+    models = {}
+
+    if os.path.exists(model_dir):
+        for name in registered_artifacts(registry):
+            model_path = os.path.join(model_dir, f'{name}.pkl')
+            if os.path.exists(model_path):
+                models[name] = joblib.load(model_path)
+
+            compiled_path = os.path.join(model_dir, COMPILED_DIR, f'{name}.pkl')
+            if use_compiled and os.path.exists(compiled_path):
+                models[compiled_key(name)] = joblib.load(compiled_path)
+
+    return models
+
+
+def _majority_vote(outputs, row, labels):
+    """Majority vote with confidence tracking (used by the predict routes)"""
+    predictions = {}
+    fraudulent_votes = 0
+    total_confidence = 0
+
+    for key, fraud, confidence, _ in outputs:
+        predictions[key] = {
+            'prediction': labels[1] if fraud[row] else labels[0],
+            'confidence': float(confidence[row])
+        }
+        fraudulent_votes += int(fraud[row])
+        total_confidence += float(confidence[row])
+
+    vote_count = len(outputs)
+    if vote_count > 0:
+        ensemble_prediction = labels[1] if fraudulent_votes > vote_count / 2 else labels[0]
+        ensemble_confidence = total_confidence / vote_count
+    else:
+        ensemble_prediction = labels[0]
+        ensemble_confidence = 50.0
+
+    return {
+        'predictions': predictions,
+        'ensemble_result': ensemble_prediction,
+        'ensemble_confidence': round(ensemble_confidence, 1),
+        'vote_breakdown': {
+            'fraudulent_votes': fraudulent_votes,
+            'real_votes': vote_count - fraudulent_votes,
+            'total_models': vote_count
+        }
+    }
+
+
+def _fraud_share_vote(outputs, row, labels):
+    """Share of members voting fraudulent as a 0-100 risk score"""
+    predictions = {}
+    fraud_votes = 0
+
+    for key, fraud, confidence, _ in outputs:
+        predictions[key] = {
+            'prediction': labels[1] if fraud[row] else labels[0],
+            'confidence': float(confidence[row])
+        }
+        fraud_votes += int(fraud[row])
+
+    total_models = len(outputs)
+    return {
+        'predictions': predictions,
+        'risk': (fraud_votes / total_models) * 100 if total_models > 0 else 50
+    }
+
+
+VOTE_RULES = {
+    'majority': _majority_vote,
+    'fraud_share': _fraud_share_vote
+}
+
+# Scoring modes accepted by EnsembleEngine.predict / predict_matrix
+MODES = ('full', 'cascade', 'fast', 'reduced')
+
+# Weight of the latest call in the moving average of each member's cost
+COST_SMOOTHING = 0.1
+
+
+def takes_raw_features(model):
+    """True for compiled forests with the scaler folded into their thresholds"""
+    return getattr(model, 'raw_features', False)
+
+
+def member_output(model, features):
+    """
+    Score a matrix with one model call
+
+    Returns:
+        (fraud mask, confidence 0-100, fraud probability) arrays, one entry per row
+    """
+    try:
+        proba = model.predict_proba(features)
+    except Exception:
+        # Models without probability estimates fall back to the decision function
+        decision = np.asarray(model.decision_function(features), dtype=float)
+        fraud = decision > 0
+        return fraud, np.clip(np.abs(decision) * 20, 50, 100), fraud.astype(float)
+
+    fraud = np.argmax(proba, axis=1) == 1
+    return fraud, np.max(proba, axis=1) * 100, proba[:, 1]
+
+
+def member_variant(model):
+    """'compiled' for the NumPy tree evaluator, 'library' for the estimator itself"""
+    return 'compiled' if isinstance(model, CompiledForest) else 'library'
+
+
+def _timed_member_output(model, features):
+    """member_output and its wall time in nanoseconds"""
+    started = time.perf_counter_ns()
+    output = member_output(model, features)
+    return output, time.perf_counter_ns() - started
+
+
+def _skipped_models(result):
+    """Members a deadline-bound result was voted without"""
+    return list(result.get('vote_breakdown', result).get('skipped_models', []))
+
+
+class EnsembleEngine:
+    """Scores postings against the ensembles declared in a registry"""
+
+    def __init__(self, models, registry=None, compiled_max_rows=32, cache=None, executor=None,
+                 cascade_bands=None, fast_bands=None):
+        self.models = models
+        self.registry = registry or ENSEMBLES
+        # Per-ensemble (low, high) overrides of the registry's cascade bands
+        self.cascade_bands = dict(cascade_bands or {})
+        # Per-ensemble (low, high) overrides of the registry's fast-mode bands
+        self.fast_bands = dict(fast_bands or {})
+        # Optional shared thread pool running the members of one request
+        # concurrently; XGBoost and CatBoost release the GIL while predicting
+        self.executor = executor
+        # Optional LRUCache of per-row results keyed on the canonical feature vector
+        self.cache = cache
+        # Moving average of each (artifact, variant)'s wall time per row in
+        # seconds; deadline-bound requests start the cheapest members first
+        self.member_costs = {}
+        # The NumPy evaluator wins on small matrices; large batches are
+        # faster through the libraries' native predictors
+        self.compiled_max_rows = compiled_max_rows
+
+    @property
+    def version(self):
+        """Version of the model bundle being served"""
+        return getattr(self.models, 'version', None)
+
+    def warm_up(self, samples=None):
+        """
+        Score rows through every ensemble (and its lookup table) in every mode,
+        on both the compiled and library paths
+
+        `samples` maps an ensemble to example postings, repeated or cut to
+        each matrix size; ensembles without samples score default postings.
+        """
+        for name in self.registry:
+            postings = (samples or {}).get(name) or [{}]
+            for n_rows in (1, self.compiled_max_rows + 1):
+                rows = (postings * (n_rows // len(postings) + 1))[:n_rows]
+                try:
+                    features = self.feature_matrix(name, rows)
+                    self.lookup(name, features)
+                    for mode in MODES:
+                        self.score_matrix(name, features, mode=mode)
+                except LookupError:
+                    # Ensembles whose scaler is missing are reported per request
+                    pass
+
+    def member_artifact(self, model_name, n_rows):
+        """
+        Key of the artifact serving model_name for an n_rows request, or None
+
+        The compiled evaluator for small matrices, the library estimator
+        otherwise. Only checks membership, so a lazy store loads nothing.
+        """
+        if compiled_key(model_name) in self.models and (n_rows <= self.compiled_max_rows or model_name not in self.models):
+            return compiled_key(model_name)
+        return model_name if model_name in self.models else None
+
+    def member_model(self, model_name, n_rows):
+        """Compiled evaluator for small matrices, library estimator otherwise"""
+        artifact = self.member_artifact(model_name, n_rows)
+        return self.models.get(artifact) if artifact is not None else None
+
+    def feature_matrix(self, name, postings, defaults=None):
+        """
+        Stack postings into one (n_postings, n_features) matrix in training order
+
+        Raises FeatureValidationError when any posting holds an invalid value.
+        """
+        features, errors = self.validated_matrix(name, postings, defaults)
+        if errors:
+            raise FeatureValidationError(errors)
+        return features
+
+    def validated_matrix(self, name, postings, defaults=None):
+        """(feature matrix, {posting index: validation messages}) through the ensemble's schema"""
+        spec = self.registry[name]
+        fallback = dict(spec['defaults'])
+        fallback.update(defaults or {})
+        with profiling.stage('features'):
+            return spec['schema'].matrix(postings, fallback)
+
+    def transform(self, name, features):
+        """Apply the ensemble's scaler, failing if it was never trained"""
+        spec = self.registry[name]
+        if spec['scaler'] not in self.models:
+            raise LookupError(f"{spec['title']} scaler not found. Please retrain models.")
+        started = time.perf_counter_ns()
+        scaled = self.models[spec['scaler']].transform(features)
+        elapsed_ns = time.perf_counter_ns() - started
+        SCALER_LATENCY.observe(elapsed_ns / 1e9, spec['scaler'])
+        profiling.record('scale', elapsed_ns)
+        return scaled
+
+    def members(self, name, n_rows):
+        """(key, artifact name, model) of the members loaded for an n_rows request"""
+        members = []
+        for key, model_name in self.registry[name]['members']:
+            model = self.member_model(model_name, n_rows)
+            if model is not None:
+                members.append((key, model_name, model))
+        return members
+
+    def member_variants(self, name, n_rows):
+        """
+        {artifact: 'compiled' | 'library'} of the members serving an n_rows
+        request, from the artifacts available without loading any of them
+        """
+        variants = {}
+        for _, model_name in self.registry[name]['members']:
+            artifact = self.member_artifact(model_name, n_rows)
+            if artifact is not None:
+                variants[model_name] = 'library' if artifact == model_name else 'compiled'
+        return variants
+
+    def member_outputs(self, name, features, timings=None, keys=None, deadline=None, skipped=None):
+        """
+        One (key, fraud, confidence, probability) tuple per loaded member
+
+        `features` is the unscaled matrix. It is scaled once, and only when
+        some member was not compiled with the scaler folded into it. When a
+        `timings` dict is given it receives each member's wall time in ms.
+        `keys` restricts scoring to those members. With a `deadline` (a
+        time.monotonic() value) only the members that finish in time are
+        returned and the keys of the others are appended to `skipped`.
+        """
+        members = self.members(name, features.shape[0])
+        if keys is not None:
+            members = [member for member in members if member[0] in keys]
+        scaled = None
+        if members:
+            if not all(takes_raw_features(model) for _, _, model in members):
+                scaled = self.transform(name, features)
+        elif keys is None:
+            # Nothing loaded: report a missing scaler before an empty vote
+            scaled = self.transform(name, features)
+
+        outputs = self._run_members(members, features, scaled, timings, deadline)
+        if skipped is not None:
+            ran = {output[0] for output in outputs}
+            skipped.extend(key for key, _, _ in members if key not in ran)
+        return outputs
+
+    def member_cost(self, model_name, model, n_rows):
+        """
+        Expected wall time of scoring n_rows rows in seconds (0 until first
+        measured); per-call overhead is spread over the rows it was measured
+        on, so larger matrices are overestimated rather than under
+        """
+        return self.member_costs.get((model_name, member_variant(model)), 0.0) * n_rows
+
+    def _run_until(self, members, inputs, n_rows, deadline):
+        """
+        (members, results) of the members that finished by the deadline,
+        started cheapest first; the cheapest always runs so there is a vote
+
+        A member is only started when its expected cost still fits. On the
+        executor the others start at once while the cheapest runs on the
+        calling thread, so waiting on it is never stuck behind other work;
+        those still running at the deadline are abandoned (cancelled if not
+        yet started).
+        """
+        order = sorted(range(len(members)), key=lambda i: self.member_cost(members[i][1], members[i][2], n_rows))
+        done = {}
+        if self.executor is not None and len(members) > 1:
+            now = time.monotonic()
+            futures = {
+                self.executor.submit(_timed_member_output, members[i][2], inputs[i]): i
+                for i in order[1:]
+                if now + self.member_cost(members[i][1], members[i][2], n_rows) <= deadline
+            }
+            done[order[0]] = _timed_member_output(members[order[0]][2], inputs[order[0]])
+            if futures:
+                finished, pending = wait(futures, timeout=max(deadline - time.monotonic(), 0))
+                for future in pending:
+                    future.cancel()
+                done.update((futures[future], future.result()) for future in finished)
+        else:
+            for i in order:
+                _, model_name, model = members[i]
+                if done and time.monotonic() + self.member_cost(model_name, model, n_rows) > deadline:
+                    break
+                done[i] = _timed_member_output(model, inputs[i])
+
+        ran = sorted(done)
+        return [members[i] for i in ran], [done[i] for i in ran]
+
+    def _run_members(self, members, features, scaled, timings=None, deadline=None):
+        """Score (key, artifact name, model) members, recording their latencies and costs"""
+        inputs = [features if takes_raw_features(model) else scaled for _, _, model in members]
+        if deadline is not None and members:
+            members, results = self._run_until(members, inputs, features.shape[0], deadline)
+        elif self.executor is not None and len(members) > 1:
+            futures = [
+                self.executor.submit(_timed_member_output, model, model_input)
+                for (_, _, model), model_input in zip(members, inputs)
+            ]
+            results = [future.result() for future in futures]
+        else:
+            results = [
+                _timed_member_output(model, model_input)
+                for (_, _, model), model_input in zip(members, inputs)
+            ]
+
+        outputs = []
+        for (key, model_name, model), (output, elapsed_ns) in zip(members, results):
+            outputs.append((key,) + output)
+            variant = member_variant(model)
+            elapsed = elapsed_ns / 1e9
+            cost = self.member_costs.get((model_name, variant))
+            per_row = elapsed / features.shape[0]
+            self.member_costs[(model_name, variant)] = per_row if cost is None else cost + COST_SMOOTHING * (per_row - cost)
+            MODEL_LATENCY.observe(elapsed, model_name, variant)
+            MODEL_ROWS.inc(model_name, variant, amount=features.shape[0])
+            profiling.record(f'model:{model_name}', elapsed_ns)
+            if timings is not None:
+                timings[key] = round(elapsed_ns / 1e6, 3)
+        return outputs
+
+    def vote(self, name, outputs, n_rows):
+        """Apply the ensemble's vote rule to every row"""
+        spec = self.registry[name]
+        rule = VOTE_RULES[spec['vote']]
+        with profiling.stage('vote'):
+            return [rule(outputs, row, spec['labels']) for row in range(n_rows)]
+
+    def cascade_band(self, name):
+        """(low, high) escalation band of an ensemble's cascade, or None without one"""
+        cascade = self.registry[name].get('cascade')
+        if cascade is None:
+            return None
+        return tuple(self.cascade_bands.get(name, cascade['band']))
+
+    def score_cascade(self, name, features, timings=None):
+        """
+        Early-exit scoring: the cascade's first member scores every row, and
+        rows it is unsure about (fraud probability inside the band) are
+        escalated to the remaining members and the full vote
+
+        Each result reports the stages that ran under 'cascade'.
+        """
+        spec = self.registry[name]
+        first = spec['cascade']['first']
+        low, high = self.cascade_band(name)
+        n_rows = features.shape[0]
+
+        first_outputs = self.member_outputs(name, features, timings, keys=[first])
+        if not first_outputs:
+            # First stage not loaded: every row escalates
+            escalated = np.arange(n_rows)
+            probability = np.full(n_rows, np.nan)
+            results = [None] * n_rows
+        else:
+            _, fraud, confidence, probability = first_outputs[0]
+            escalated = np.flatnonzero((probability >= low) & (probability <= high))
+            results = self.vote(name, first_outputs, n_rows)
+
+        remaining = [key for key, _ in spec['members'] if key != first]
+        stages = {}
+        if len(escalated):
+            outputs = self.member_outputs(name, features[escalated], timings, keys=remaining)
+            if first_outputs:
+                outputs.append((first, fraud[escalated], confidence[escalated], probability[escalated]))
+                order = [key for key, _ in spec['members']]
+                outputs.sort(key=lambda output: order.index(output[0]))
+            ran = [output[0] for output in outputs]
+            for row, result in zip(escalated, self.vote(name, outputs, len(escalated))):
+                results[row] = result
+                stages[row] = ran
+
+        for row, result in enumerate(results):
+            result['cascade'] = {
+                'first_stage': first,
+                'first_stage_probability': None if np.isnan(probability[row]) else round(float(probability[row]), 4),
+                'band': [low, high],
+                'escalated': row in stages,
+                'stages': stages.get(row, [first])
+            }
+        return results
+
+    def fast_band(self, name):
+        """(low, high) escalation band of an ensemble's fast mode, or None without one"""
+        fast = self.registry[name].get('fast')
+        if fast is None:
+            return None
+        return tuple(self.fast_bands.get(name, fast['band']))
+
+    def score_fast(self, name, features, timings=None):
+        """
+        Distilled scoring: the ensemble's student model scores every row with
+        one call, and rows it is unsure about (fraud probability inside the
+        band) are rescored by the full ensemble
+
+        Rows answered by the student carry its output under 'predictions' and
+        the vote rule applied to it alone. Each result reports the student's
+        probability and whether it escalated under 'fast'.
+        """
+        model_name = self.registry[name]['fast']['model']
+        low, high = self.fast_band(name)
+        n_rows = features.shape[0]
+
+        model = self.member_model(model_name, n_rows)
+        if model is None:
+            # Student not trained for this bundle: every row escalates
+            escalated = np.arange(n_rows)
+            probability = np.full(n_rows, np.nan)
+            results = [None] * n_rows
+        else:
+            scaled = None if takes_raw_features(model) else self.transform(name, features)
+            outputs = self._run_members([('student', model_name, model)], features, scaled, timings)
+            probability = outputs[0][3]
+            escalated = np.flatnonzero((probability >= low) & (probability <= high))
+            results = self.vote(name, outputs, n_rows)
+
+        if len(escalated):
+            full = self.vote(name, self.member_outputs(name, features[escalated], timings), len(escalated))
+            for row, result in zip(escalated, full):
+                results[row] = result
+
+        escalated = set(escalated.tolist())
+        for row, result in enumerate(results):
+            result['fast'] = {
+                'model': model_name,
+                'student_probability': None if np.isnan(probability[row]) else round(float(probability[row]), 4),
+                'band': [low, high],
+                'escalated': row in escalated
+            }
+        return results
+
+    def score_matrix(self, name, features, timings=None, mode='full', deadline=None):
+        """
+        Score an unscaled feature matrix through the ensemble, bypassing the cache
+
+        A `deadline` (time.monotonic() value) bounds the full and reduced
+        votes: they count the members that finished in time and, when some
+        did not, list them under 'skipped_models' in vote_breakdown. The
+        cascade and fast modes ignore it.
+        """
+        if mode not in MODES:
+            raise ValueError(f"Unknown mode: {mode}. Expected one of: {', '.join(MODES)}")
+        if mode == 'cascade' and self.cascade_band(name) is not None:
+            return self.score_cascade(name, features, timings)
+        if mode == 'fast' and self.fast_band(name) is not None:
+            return self.score_fast(name, features, timings)
+        if mode == 'reduced' and 'reduced' in self.registry[name]:
+            results = self._score_members(name, features, timings, self.registry[name]['reduced'], deadline)
+            if results is not None:
+                return results
+        return self._score_members(name, features, timings, deadline=deadline)
+
+    def _score_members(self, name, features, timings=None, keys=None, deadline=None):
+        """Vote over the members (all, or `keys`); None when `keys` match no loaded member"""
+        skipped = None if deadline is None else []
+        outputs = self.member_outputs(name, features, timings, keys, deadline, skipped)
+        if keys is not None and not outputs:
+            return None
+        results = self.vote(name, outputs, features.shape[0])
+        if skipped:
+            for result in results:
+                # Rules without a vote breakdown report it at the top level
+                result.get('vote_breakdown', result)['skipped_models'] = list(skipped)
+        return results
+
+    def cache_key(self, name, row, mode='full'):
+        """Ensemble, mode, model version and canonical feature bytes (+ 0.0 folds -0.0 into 0.0)"""
+        if mode == 'cascade':
+            mode = ('cascade', self.cascade_band(name))
+        elif mode == 'fast':
+            mode = ('fast', self.fast_band(name))
+        return (name, mode, self.version, (row + 0.0).tobytes())
+
+    def lookup(self, name, features):
+        """
+        Precomputed full-mode results from the ensemble's lookup table, None
+        for rows off its grid
+
+        The table is only used when it was built from the same member
+        variants that would score this matrix.
+        """
+        n_rows = features.shape[0]
+        table_name = self.registry[name].get('lookup')
+        table = self.models.get(table_name) if table_name else None
+        if table is None or table.variants != self.member_variants(name, n_rows):
+            return [None] * n_rows
+        return [table.get(row) for row in features]
+
+    def predict_matrix(self, name, features, timings=None, mode='full', deadline=None):
+        """
+        Score an unscaled feature matrix, only running the ensemble on rows
+        missing from the lookup table and the cache
+
+        `timings` (see member_outputs) stays empty when no row was scored.
+        With a `deadline` (see score_matrix) every result lists its skipped
+        members, and partial votes are never cached.
+        """
+        if mode == 'full':
+            with profiling.stage('lookup'):
+                results = self.lookup(name, features)
+        else:
+            results = [None] * features.shape[0]
+        missing = [row for row, result in enumerate(results) if result is None]
+
+        if missing and self.cache is None:
+            for row, result in zip(missing, self.score_matrix(name, features[missing], timings, mode, deadline)):
+                results[row] = result
+        elif missing:
+            with profiling.stage('cache'):
+                keys = {row: self.cache_key(name, features[row], mode) for row in missing}
+                for row in missing:
+                    results[row] = self.cache.get(keys[row])
+            uncached = [row for row in missing if results[row] is None]
+
+            if uncached:
+                for row, result in zip(uncached, self.score_matrix(name, features[uncached], timings, mode, deadline)):
+                    if not _skipped_models(result):
+                        self.cache.put(keys[row], result)
+                    results[row] = result
+
+        # Callers add response fields, so never hand out a stored dict itself
+        results = [dict(result) for result in results]
+        if deadline is not None:
+            for result in results:
+                if 'vote_breakdown' in result:
+                    result['vote_breakdown'] = dict(result['vote_breakdown'], skipped_models=_skipped_models(result))
+                else:
+                    result['skipped_models'] = _skipped_models(result)
+        return results
+
+    def predict(self, name, postings, defaults=None, timings=None, mode='full', deadline=None):
+        """Score raw postings, one result per posting"""
+        return self.predict_matrix(name, self.feature_matrix(name, postings, defaults), timings, mode, deadline)
@@ -0,0 +1,132 @@
+"""
+Feature Schemas
+Order, default and valid range of the job and internship model features,
+shared by train_models.py and the API so the column order used to train a
+model is the one it is served with
+"""
+
+import reprlib
+
+import numpy as np
+
+
+class FeatureValidationError(ValueError):
+    """Postings with invalid feature values; `errors` maps row index -> messages"""
+
+    def __init__(self, errors):
+        self.errors = errors
+        row = min(errors)
+        more = f' (and {len(errors) - 1} more postings)' if len(errors) > 1 else ''
+        super().__init__(f"Invalid features in posting {row}: {'; '.join(errors[row])}{more}")
+
+
+class FeatureSchema:
+    """
+    Ordered feature specification compiled into per-column arrays
+
+    fields: (name, default, low, high) tuples in training order; values
+    outside [low, high] are rejected. Matrices are float64 like the training
+    data: the scalers were fitted and the compiled thresholds folded in
+    float64, and float32 rounding of raw values flips member votes.
+    """
+
+    def __init__(self, fields, dtype=np.float64):
+        self.names = [name for name, _, _, _ in fields]
+        self.defaults = {name: default for name, default, _, _ in fields}
+        self.low = np.array([low for _, _, low, _ in fields], dtype=dtype)
+        self.high = np.array([high for _, _, _, high in fields], dtype=dtype)
+        self.dtype = dtype
+        # Finite stand-in for an open upper bound, so that inf is out of range
+        self._upper = np.minimum(self.high, np.finfo(dtype).max)
+
+    def __len__(self):
+        return len(self.names)
+
+    def matrix(self, postings, defaults=None):
+        """
+        (matrix, errors) for a list of posting dicts
+
+        Fills the C-contiguous (n_postings, n_features) matrix in a single
+        pass over the postings (numbers, booleans and numeric strings); only
+        when that fails is it rebuilt one column at a time to find the
+        offending values. Missing or null values take the default. errors
+        maps the index of every invalid posting to its messages; invalid
+        values are replaced by the default.
+        """
+        fallback = dict(self.defaults)
+        fallback.update(defaults or {})
+        fields = [(name, fallback[name]) for name in self.names]
+        errors = {}
+
+        try:
+            X = np.fromiter(
+                (default if (value := posting.get(name)) is None else value
+                 for posting in postings for name, default in fields),
+                dtype=self.dtype, count=len(postings) * len(fields)
+            ).reshape(len(postings), len(fields))
+        except (TypeError, ValueError, OverflowError):
+            X, errors = self._coerce(postings, fields)
+
+        # One comparison per bound on the common path; NaN fails both
+        if not ((X >= self.low) & (X <= self._upper)).all():
+            for i, messages in self.range_errors(X).items():
+                errors.setdefault(i, []).extend(messages)
+                bad = ~np.isfinite(X[i]) | (X[i] < self.low) | (X[i] > self.high)
+                X[i, bad] = [fallback[self.names[j]] for j in np.flatnonzero(bad)]
+        return X, dict(sorted(errors.items()))
+
+    def _coerce(self, postings, fields):
+        """Column-by-column matrix build converting unparseable values to defaults"""
+        X = np.empty((len(postings), len(fields)), dtype=self.dtype)
+        errors = {}
+        for j, (name, default) in enumerate(fields):
+            column = [posting.get(name) for posting in postings]
+            column = [default if value is None else value for value in column]
+            try:
+                X[:, j] = column
+            except (TypeError, ValueError, OverflowError):
+                for i, value in enumerate(column):
+                    try:
+                        X[i, j] = float(value)
+                    except (TypeError, ValueError, OverflowError):
+                        X[i, j] = default
+                        errors.setdefault(i, []).append(f'{name}: expected a number, got {reprlib.repr(value)}')
+        return X, errors
+
+    def range_errors(self, X):
+        """{row: messages} for the rows of a feature matrix holding non-finite or out-of-range values"""
+        X = np.asarray(X, dtype=self.dtype)
+        bad = ~np.isfinite(X) | (X < self.low) | (X > self.high)
+        errors = {}
+        for i, j in zip(*np.nonzero(bad)):
+            errors.setdefault(int(i), []).append(
+                f'{self.names[j]}: {X[i, j]:g} outside [{self.low[j]:g}, {self.high[j]:g}]'
+            )
+        return errors
+
+
+INF = float('inf')
+
+# Feature order used during training (see train_models.py)
+JOB_SCHEMA = FeatureSchema([
+    ('salary_min', 0, 0, INF),
+    ('salary_max', 0, 0, INF),
+    ('company_experience_years', 0, 0, 200),
+    ('job_description_length', 0, 0, INF),
+    ('required_experience_years', 0, 0, 100),
+    ('required_education_level', 0, 0, 4),
+    ('telecommute_allowed', 0, 0, 1),
+    ('has_company_logo', 0, 0, 1)
+])
+INTERNSHIP_SCHEMA = FeatureSchema([
+    ('company_registered', 0, 0, 1),
+    ('official_email', 0, 0, 1),
+    ('website_available', 0, 0, 1),
+    ('stipend_offered', 0, 0, 1),
+    ('stipend_amount', 0, 0, INF),
+    ('registration_fee', 0, 0, INF),
+    ('interview_process', 0, 0, 1),
+    ('duration_months', 0, 0, 120),
+    ('job_description_quality', 0, 0, 5),
+    ('social_media_presence', 0, 0, 2)
+])
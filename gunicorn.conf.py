@@ -0,0 +1,90 @@
+"""
+Gunicorn Configuration
+Pre-fork production server: the master imports app.py, loads and warms every
+model and freezes the GC heap, then forks the workers so the forests and
+boosters are shared copy-on-write
+
+Usage:
+    gunicorn -c gunicorn.conf.py app:app
+    kill -HUP <master pid>     # replace every worker gracefully
+"""
+
+import gc
+import os
+import threading
+import time
+
+# Read before app.py is imported, so the app also runs with ProductionConfig
+# and leaves the warm-up to when_ready
+os.environ.setdefault('FLASK_CONFIG', 'production')
+os.environ.setdefault('WARM_UP_ON_START', '0')
+# Admission control can only time waits inside the worker; see below
+os.environ.setdefault('ADMISSION_MAX_IN_FLIGHT', '0')
+
+from config import ProductionConfig
+from worker_memory import memory_usage
+
+bind = ProductionConfig.BIND
+workers = ProductionConfig.WORKERS
+threads = ProductionConfig.WORKER_THREADS
+timeout = ProductionConfig.WORKER_TIMEOUT
+graceful_timeout = ProductionConfig.WORKER_GRACEFUL_TIMEOUT
+max_requests = ProductionConfig.WORKER_MAX_REQUESTS
+max_requests_jitter = ProductionConfig.WORKER_MAX_REQUESTS_JITTER
+
+# Import the app in the master instead of in every worker
+preload_app = True
+
+# With no more threads than admission slots, requests wait in the listen
+# socket rather than for a slot, and the degradation levels never trigger
+# unless the proxy stamps their arrival in X-Request-Start
+if (ProductionConfig.ADMISSION_MAX_IN_FLIGHT and not ProductionConfig.ADMISSION_REQUEST_START
+        and threads <= ProductionConfig.ADMISSION_MAX_IN_FLIGHT):
+    raise RuntimeError(
+        f'ADMISSION_MAX_IN_FLIGHT={ProductionConfig.ADMISSION_MAX_IN_FLIGHT} needs WORKER_THREADS above it '
+        f'(got {threads}) or a proxy setting X-Request-Start with ADMISSION_REQUEST_START=1'
+    )
+
+
+def _format_memory(usage):
+    if usage is None:
+        return 'memory unavailable'
+    return ', '.join(f"{name[:-len('_bytes')]} {value / 2 ** 20:.1f} MiB" for name, value in usage.items())
+
+
+def _report_memory(server, interval):
+    """Log the memory of every live worker and their combined PSS"""
+    while True:
+        time.sleep(interval)
+        total_pss = 0
+        for pid, worker in list(server.WORKERS.items()):
+            usage = memory_usage(pid)
+            if usage is not None:
+                total_pss += usage['pss_bytes']
+            server.log.info('Worker %s (age %s): %s', pid, worker.age, _format_memory(usage))
+        server.log.info('Workers: %d, combined PSS %.1f MiB', len(server.WORKERS), total_pss / 2 ** 20)
+
+
+def when_ready(server):
+    """Runs in the master after the app is imported and before the first fork"""
+    import app as api
+
+    # Models load lazily; load (and warm) them all here so workers inherit
+    # them, and are forked already answering /api/ready
+    if not api.warm_up():
+        server.log.error('Warm-up failed: %s', api.readiness['error'])
+    # Keep the collector from writing to the inherited objects' headers, which
+    # would copy their pages into every worker
+    gc.collect()
+    gc.freeze()
+    server.log.info('Model version %s loaded (%.1f MiB resident), %d objects frozen',
+                    api.engine.version, api.engine.models.resident_bytes() / 2 ** 20, gc.get_freeze_count())
+
+    if ProductionConfig.WORKER_MEMORY_REPORT_INTERVAL:
+        threading.Thread(target=_report_memory, args=(server, ProductionConfig.WORKER_MEMORY_REPORT_INTERVAL),
+                         name='worker-memory', daemon=True).start()
+
+
+def worker_exit(server, worker):
+    """Runs in a worker on its way out, e.g. when recycled after max_requests"""
+    server.log.info('Worker %s exiting after %d requests: %s', worker.pid, worker.nr, _format_memory(memory_usage()))
@@ -0,0 +1,83 @@
+"""
+Ensemble Lookup Tables
+Precomputed ensemble results for every posting on a grid of common feature
+values, served by exact row lookup instead of running the members
+"""
+
+import itertools
+import numpy as np
+
+
+class LookupTable:
+    """
+    Ensemble results keyed on the exact (unscaled) feature row
+
+    values:   per-feature tuple of covered values; the grid is their product
+    variants: {artifact: 'compiled' | 'library'} member variants that produced
+              the results, so a table is never served in place of other models
+    """
+
+    def __init__(self, name, features, values, results, variants):
+        self.name = name
+        self.features = list(features)
+        self.values = [tuple(column) for column in values]
+        self.results = results
+        self.variants = dict(variants)
+
+    def __len__(self):
+        return len(self.results)
+
+    def get(self, row):
+        """Stored result for a row on the grid, else None (-0.0 matches 0.0)"""
+        return self.results.get(tuple(row.tolist()))
+
+    def covers(self, X):
+        """Mask of the rows of X that lie on the grid"""
+        X = np.asarray(X, dtype=float)
+        return np.all([np.isin(X[:, i], column) for i, column in enumerate(self.values)], axis=0)
+
+
+def grid_values(X, min_share=0.01):
+    """Per column, the values taken by at least `min_share` of the rows"""
+    values = []
+    for column in np.asarray(X, dtype=float).T:
+        unique, counts = np.unique(column, return_counts=True)
+        values.append(tuple(unique[counts >= min_share * len(column)].tolist()))
+    return values
+
+
+def grid_size(values):
+    return int(np.prod([len(column) for column in values]))
+
+
+def build_lookup(engine, name, values):
+    """
+    Score every grid row through `engine` the way single postings are served
+
+    Rows are scored in chunks of engine.compiled_max_rows so the members run
+    on the same (compiled or library) variant as a one-posting request.
+    """
+    grid = np.array(list(itertools.product(*values)), dtype=float)
+    step = max(engine.compiled_max_rows, 1)
+    results = {}
+    for start in range(0, len(grid), step):
+        chunk = grid[start:start + step]
+        for row, result in zip(chunk, engine.score_matrix(name, chunk)):
+            results[tuple(row.tolist())] = result
+    return LookupTable(name, engine.registry[name]['schema'].names, values, results,
+                       engine.member_variants(name, 1))
+
+
+def verify_lookup(table, engine, name, X):
+    """
+    (rows of X on the grid, rows whose stored result differs from live scoring)
+
+    Every covered row is rescored as a single posting, bypassing the table.
+    """
+    X = np.asarray(X, dtype=float)
+    covered = np.flatnonzero(table.covers(X))
+    mismatches = sum(
+        table.get(X[row]) != engine.score_matrix(name, X[row:row + 1])[0]
+        for row in covered
+    )
+    return len(covered), int(mismatches)
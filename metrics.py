@@ -0,0 +1,179 @@
+"""
+Metrics
+Counters and fixed-bucket latency histograms rendered in the Prometheus text
+exposition format. Each thread records into its own shard without taking a
+lock; shards are only merged when /api/metrics is scraped.
+"""
+
+import threading
+from bisect import bisect_left
+
+# Latency buckets in seconds (upper bounds, "le")
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _merge(into, values):
+    for labels, cell in list(values.items()):
+        total = into.get(labels)
+        if total is None:
+            into[labels] = list(cell)
+        else:
+            for index, value in enumerate(cell):
+                total[index] += value
+
+
+def _format_labels(names, values, extra=None):
+    pairs = list(zip(names, values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in pairs)
+    return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + '}'
+
+
+def _format_value(value):
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class _ShardedMetric:
+    """
+    Metric whose cells (lists of floats keyed by label values) live in per-thread shards
+
+    A shard is only written by its own thread. Shards of finished threads are
+    folded into a retired total so thread-per-request servers do not grow the
+    shard list without bound.
+    """
+
+    type_name = None
+
+    def __init__(self, registry, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._local = threading.local()
+        self._shards = []  # (thread, {labels: cell})
+        self._retired = {}
+        self._lock = threading.Lock()
+        registry.register(self)
+
+    def _cell(self, labels):
+        try:
+            values = self._local.values
+        except AttributeError:
+            values = self._local.values = {}
+            with self._lock:
+                self._sweep()
+                self._shards.append((threading.current_thread(), values))
+
+        cell = values.get(labels)
+        if cell is None:
+            cell = values[labels] = self._new_cell()
+        return cell
+
+    def _sweep(self):
+        """Fold shards of finished threads into the retired total (lock held)"""
+        alive = []
+        for thread, values in self._shards:
+            if thread.is_alive():
+                alive.append((thread, values))
+            else:
+                _merge(self._retired, values)
+        self._shards = alive
+
+    def collect(self):
+        """{label values: merged cell} across every shard"""
+        with self._lock:
+            self._sweep()
+            merged = {}
+            _merge(merged, self._retired)
+            for _, values in self._shards:
+                _merge(merged, values)
+        return merged
+
+
+class Counter(_ShardedMetric):
+    type_name = 'counter'
+
+    def _new_cell(self):
+        return [0.0]
+
+    def inc(self, *labels, amount=1):
+        self._cell(labels)[0] += amount
+
+    def render(self):
+        return [
+            f'{self.name}{_format_labels(self.labelnames, labels)} {_format_value(cell[0])}'
+            for labels, cell in sorted(self.collect().items())
+        ]
+
+
+class Histogram(_ShardedMetric):
+    """Fixed-bucket histogram; a cell holds per-bucket counts, then the sum and the count"""
+
+    type_name = 'histogram'
+
+    def __init__(self, registry, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        super().__init__(registry, name, documentation, labelnames)
+
+    def _new_cell(self):
+        return [0.0] * (len(self.buckets) + 3)
+
+    def observe(self, value, *labels):
+        cell = self._cell(labels)
+        # Values above the last bound land in the +Inf bucket at len(buckets)
+        cell[bisect_left(self.buckets, value)] += 1
+        cell[-2] += value
+        cell[-1] += 1
+
+    def render(self):
+        lines = []
+        for labels, cell in sorted(self.collect().items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + ('+Inf',), cell):
+                cumulative += count
+                le = ('le', bound if bound == '+Inf' else repr(bound))
+                lines.append(f'{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {_format_value(cumulative)}')
+            lines.append(f'{self.name}_sum{_format_labels(self.labelnames, labels)} {_format_value(cell[-2])}')
+            lines.append(f'{self.name}_count{_format_labels(self.labelnames, labels)} {_format_value(cell[-1])}')
+        return lines
+
+
+class Registry:
+    """Metrics plus callbacks sampled at scrape time (e.g. cache statistics)"""
+
+    def __init__(self):
+        self._metrics = []
+        self._collectors = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+
+    def register_collector(self, name, type_name, documentation, labelnames, collect):
+        """collect() returns {label values: value}, evaluated on every scrape"""
+        self._collectors.append((name, type_name, documentation, tuple(labelnames), collect))
+
+    def render(self):
+        lines = []
+        for metric in self._metrics:
+            lines.append(f'# HELP {metric.name} {metric.documentation}')
+            lines.append(f'# TYPE {metric.name} {metric.type_name}')
+            lines.extend(metric.render())
+        for name, type_name, documentation, labelnames, collect in self._collectors:
+            lines.append(f'# HELP {name} {documentation}')
+            lines.append(f'# TYPE {name} {type_name}')
+            for labels, value in sorted(collect().items()):
+                if value is not None:
+                    lines.append(f'{name}{_format_labels(labelnames, labels)} {_format_value(value)}')
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+
+REQUESTS = Counter(REGISTRY, 'api_requests_total', 'HTTP requests by route, method and status', ('route', 'method', 'status'))
+REQUEST_LATENCY = Histogram(REGISTRY, 'api_request_duration_seconds', 'Time spent handling a request', ('route',))
+MODEL_LATENCY = Histogram(REGISTRY, 'model_predict_duration_seconds', 'Time per ensemble member call', ('model', 'variant'))
+MODEL_ROWS = Counter(REGISTRY, 'model_rows_total', 'Rows scored by each ensemble member', ('model', 'variant'))
+SCALER_LATENCY = Histogram(REGISTRY, 'scaler_transform_duration_seconds', 'Time per scaler transform', ('scaler',))
+TEXT_ANALYSIS_LATENCY = Histogram(REGISTRY, 'analyze_text_duration_seconds', 'Time per ScamTextAnalyzer.analyze_text call (cache misses only)')
@@ -0,0 +1,103 @@
+"""
+Micro-Batcher
+Coalesces concurrent single-posting predictions into one feature matrix so
+the ensemble members run once per batch instead of once per request
+"""
+
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import numpy as np
+
+
+class MicroBatcher:
+    """
+    Queue single rows for up to max_wait_ms (or max_rows rows) and score them together
+
+    Rows are grouped by engine, ensemble and mode, so every caller is answered
+    by the model version it was submitted against even across a hot reload.
+    """
+
+    def __init__(self, max_rows=32, max_wait_ms=2.0):
+        self.max_rows = max_rows
+        self.max_wait = max_wait_ms / 1000
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._worker_pid = None
+        self.batches = 0
+        self.rows = 0
+
+    def predict(self, engine, name, row, timings=None, mode='full'):
+        """
+        Result of engine.predict_matrix(name, row[None, :], mode=mode), computed in a shared batch
+
+        Blocks until the batch containing the row has been scored; errors
+        raised while scoring the batch are re-raised in every caller.
+        """
+        self._ensure_worker()
+        future = Future()
+        self._queue.put((engine, (name, mode), row, timings, future))
+        return future.result()
+
+    def _ensure_worker(self):
+        # Threads do not survive fork, so each worker process starts its own
+        if self._worker_pid == os.getpid():
+            return
+        with self._lock:
+            if self._worker_pid != os.getpid():
+                threading.Thread(target=self._run, name='micro-batcher', daemon=True).start()
+                self._worker_pid = os.getpid()
+
+    def _collect(self):
+        """Block for one request, then gather more until the window closes or the batch is full"""
+        pending = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(pending) < self.max_rows:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                pending.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return pending
+
+    def _run(self):
+        while True:
+            groups = {}
+            for request in self._collect():
+                engine, scoring = request[0], request[1]
+                groups.setdefault((id(engine), scoring), []).append(request)
+            for requests in groups.values():
+                self._score(requests)
+
+    def _score(self, requests):
+        engine, (name, mode) = requests[0][0], requests[0][1]
+        try:
+            batch_timings = {}
+            features = np.vstack([row for _, _, row, _, _ in requests])
+            results = engine.predict_matrix(name, features, batch_timings, mode)
+        except Exception as e:
+            for *_, future in requests:
+                future.set_exception(e)
+            return
+
+        self.batches += 1
+        self.rows += len(requests)
+        for (_, _, _, timings, future), result in zip(requests, results):
+            if timings is not None:
+                # Member timings are per batch and shared by every row in it
+                timings.update(batch_timings)
+            future.set_result(result)
+
+    def stats(self):
+        return {
+            'batches': self.batches,
+            'rows': self.rows,
+            'mean_batch_rows': round(self.rows / self.batches, 2) if self.batches else 0.0,
+            'max_rows': self.max_rows,
+            'max_wait_ms': self.max_wait * 1000
+        }
@@ -0,0 +1,150 @@
+"""
+Lazy Model Store
+Loads model artifacts on first use, memory-maps the compiled NumPy forests so
+worker processes share their pages, and evicts least recently used models
+when a memory budget is exceeded
+"""
+
+import os
+import re
+import threading
+from collections import OrderedDict
+from collections.abc import Mapping
+import joblib
+
+from ensemble import COMPILED_DIR, compiled_key, registered_artifacts
+
+# File in the model root naming the version directory to serve
+CURRENT_POINTER = 'CURRENT'
+# Version used when models sit directly in the model root (pre-versioning layout)
+UNVERSIONED = 'unversioned'
+
+_VERSION_PATTERN = re.compile(r'^[A-Za-z0-9][A-Za-z0-9_.-]*$')
+
+
+def current_version(model_root):
+    """Version named in <model_root>/CURRENT, or None for the flat layout"""
+    pointer = os.path.join(model_root, CURRENT_POINTER)
+    if not os.path.exists(pointer):
+        return None
+    with open(pointer) as f:
+        return f.read().strip() or None
+
+
+def open_model_version(model_root, version=None, **kwargs):
+    """
+    ModelStore for models/<version>/
+
+    Defaults to the version named in CURRENT, falling back to artifacts
+    stored directly in the model root.
+    """
+    version = version or current_version(model_root)
+    if version is None or version == UNVERSIONED:
+        return ModelStore(model_root, version=UNVERSIONED, **kwargs)
+
+    if not _VERSION_PATTERN.match(version):
+        raise ValueError(f'Invalid model version: {version}')
+    path = os.path.join(model_root, version)
+    if not os.path.isdir(path):
+        raise LookupError(f'Model version {version} not found')
+    return ModelStore(path, version=version, **kwargs)
+
+
+class ModelStore(Mapping):
+    """
+    Read-only mapping of artifact name -> model, loaded on first access
+
+    Membership and keys() reflect what exists on disk, so checking
+    `name in store` never loads anything. Compiled forests are opened with
+    joblib's mmap_mode; library estimators are unpickled normally because
+    several of them (e.g. libsvm) need writable buffers. on_load, if given,
+    is called with every model as it is loaded and returns the one to keep.
+    """
+
+    def __init__(self, model_dir='models', registry=None, use_compiled=True,
+                 memory_budget=None, mmap_mode='r', version=UNVERSIONED, on_load=None):
+        self.model_dir = model_dir
+        self.version = version
+        self.memory_budget = memory_budget
+        self.mmap_mode = mmap_mode
+        self.on_load = on_load
+        self._paths = {}
+        self._resident = OrderedDict()  # least recently used first
+        self._sizes = {}
+        self._lock = threading.RLock()
+
+        if os.path.exists(model_dir):
+            for name in registered_artifacts(registry):
+                model_path = os.path.join(model_dir, f'{name}.pkl')
+                if os.path.exists(model_path):
+                    self._paths[name] = model_path
+
+                compiled_path = os.path.join(model_dir, COMPILED_DIR, f'{name}.pkl')
+                if use_compiled and os.path.exists(compiled_path):
+                    self._paths[compiled_key(name)] = compiled_path
+
+    def __getitem__(self, name):
+        with self._lock:
+            if name in self._resident:
+                self._resident.move_to_end(name)
+                return self._resident[name]
+            if name not in self._paths:
+                raise KeyError(name)
+            return self._load(name)
+
+    def __contains__(self, name):
+        return name in self._paths
+
+    def __iter__(self):
+        return iter(self._paths)
+
+    def __len__(self):
+        return len(self._paths)
+
+    def _load(self, name):
+        path = self._paths[name]
+        if name.startswith(f'{COMPILED_DIR}/') and self.mmap_mode:
+            model = joblib.load(path, mmap_mode=self.mmap_mode)
+        else:
+            model = joblib.load(path)
+        if self.on_load is not None:
+            model = self.on_load(model)
+
+        # Compiled forests know their array footprint; otherwise the pickle
+        # size is a close estimate of the unpickled estimator
+        self._sizes[name] = getattr(model, 'nbytes', None) or os.path.getsize(path)
+        self._resident[name] = model
+        self._evict(keep=name)
+        return model
+
+    def _evict(self, keep):
+        """Drop least recently used models until the store fits its budget"""
+        if self.memory_budget is None:
+            return
+        for name in list(self._resident):
+            if self.resident_bytes() <= self.memory_budget:
+                break
+            if name != keep:
+                # Requests already holding the model keep their reference
+                del self._resident[name]
+
+    def resident_bytes(self):
+        with self._lock:
+            return sum(self._sizes[name] for name in self._resident)
+
+    def resident(self):
+        """{name: {'bytes', 'memory_mapped'}} for every model currently loaded"""
+        with self._lock:
+            return {
+                name: {
+                    'bytes': self._sizes[name],
+                    'memory_mapped': name.startswith(f'{COMPILED_DIR}/') and bool(self.mmap_mode)
+                }
+                for name in self._resident
+            }
+
+    def preload(self):
+        """Load every available artifact now (budget permitting)"""
+        for name in self._paths:
+            self[name]
+        return self
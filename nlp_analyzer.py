@@ -5,9 +5,25 @@ Analyzes job descriptions and recruitment messages for scam indicators
 
 import re
 import string
+import hashlib
+import json
 from collections import Counter
 import numpy as np
 
+import profiling
+
+def _lexicon_fingerprint(*lexicons):
+    """Short stable hash of keyword lexicons, changing whenever any keyword does"""
+    encoded = json.dumps(lexicons, sort_keys=True).encode('utf-8')
+    return hashlib.blake2b(encoded, digest_size=8).hexdigest()
+
+class _Findings:
+    """Scam indicators and risk factors collected during one analysis"""
+    
+    def __init__(self):
+        self.scam_indicators = []
+        self.risk_factors = []
+
 class ScamTextAnalyzer:
     """Analyzes text for scam indicators using NLP techniques"""
     
@@ -54,10 +70,18 @@ class ScamTextAnalyzer:
         ]
     }
     
-    def __init__(self):
-        self.scam_indicators = []
-        self.credibility_score = 0
-        self.risk_factors = []
+    # Identifies the keyword lists above, so cached analyses never outlive a lexicon change
+    LEXICON_VERSION = _lexicon_fingerprint(SCAM_KEYWORDS, CREDIBILITY_INDICATORS)
+    
+    def content_key(self, text):
+        """
+        Cache key for an analysis of `text`
+        
+        The analysis depends on case, length and punctuation, so the digest
+        covers the exact text; only the lexicon version is added to it.
+        """
+        digest = hashlib.blake2b(text.encode('utf-8', 'surrogatepass'), digest_size=16).digest()
+        return (self.LEXICON_VERSION, digest)
     
     def analyze_text(self, text):
         """
@@ -69,35 +93,41 @@ class ScamTextAnalyzer:
         Returns:
             Dictionary with analysis results
         """
-        if not text or len(text.strip()) < 20:
+        return self.combine(self.scan(text), self.text_features(text))
+    
+    def scan(self, text):
+        """
+        Keyword, quality and contact checks: every analyze_text field except 'features'
+        
+        Findings are collected per call rather than on the instance, so one
+        analyzer can run scan and text_features for many requests concurrently.
+        """
+        if self._too_short(text):
             return {
                 'risk_score': 85,
                 'category': 'Suspicious',
                 'scam_indicators': ['Text too short or empty'],
                 'credibility_score': 15,
-                'explanation': 'Job description is too brief to be genuine',
-                'features': self._get_default_features()
+                'explanation': 'Job description is too brief to be genuine'
             }
         
         text_lower = text.lower()
-        
-        # Reset indicators
-        self.scam_indicators = []
-        self.credibility_score = 0
-        self.risk_factors = []
+        findings = _Findings()
         
         # Analyze various aspects
-        payment_score = self._detect_payment_requests(text_lower)
-        unrealistic_score = self._detect_unrealistic_claims(text_lower)
-        urgency_score = self._detect_urgency_tactics(text_lower)
-        vague_score = self._detect_vague_language(text_lower)
-        contact_score = self._detect_suspicious_contact(text_lower)
-        credibility = self._detect_credibility_indicators(text_lower)
+        with profiling.stage('nlp:keywords'):
+            payment_score = self._detect_payment_requests(text_lower, findings)
+            unrealistic_score = self._detect_unrealistic_claims(text_lower, findings)
+            urgency_score = self._detect_urgency_tactics(text_lower, findings)
+            vague_score = self._detect_vague_language(text_lower, findings)
+            contact_score = self._detect_suspicious_contact(text_lower, findings)
+            credibility = self._detect_credibility_indicators(text_lower)
         
         # Text quality analysis
-        quality_score = self._analyze_text_quality(text)
-        grammar_score = self._analyze_grammar_capitalization(text)
-        email_phone_score = self._detect_email_phone_patterns(text_lower)
+        with profiling.stage('nlp:quality'):
+            quality_score = self._analyze_text_quality(text, findings)
+            grammar_score = self._analyze_grammar_capitalization(text, findings)
+            email_phone_score = self._detect_email_phone_patterns(text_lower, findings)
         
         # Calculate overall risk score (0-100, higher = more risky)
         risk_score = (
@@ -123,22 +153,33 @@ class ScamTextAnalyzer:
             category = 'Genuine'
         
         # Generate explanation
-        explanation = self._generate_explanation(category, risk_score)
-        
-        # Extract NLP features for ML models
-        features = self._extract_nlp_features(text, text_lower)
+        with profiling.stage('nlp:explanation'):
+            explanation = self._generate_explanation(category, risk_score)
         
         return {
             'risk_score': round(risk_score, 1),
             'category': category,
-            'scam_indicators': self.scam_indicators,
+            'scam_indicators': findings.scam_indicators,
             'credibility_score': round(credibility, 1),
             'explanation': explanation,
-            'risk_factors': self.risk_factors,
-            'features': features
+            'risk_factors': findings.risk_factors
         }
     
-    def _detect_payment_requests(self, text):
+    def text_features(self, text):
+        """Numeric text statistics for ML models (the 'features' field of analyze_text)"""
+        if self._too_short(text):
+            return self._get_default_features()
+        with profiling.stage('nlp:features'):
+            return self._extract_nlp_features(text, text.lower())
+    
+    def combine(self, scan, features):
+        """analyze_text result from the outputs of scan and text_features"""
+        return dict(scan, features=features)
+    
+    def _too_short(self, text):
+        return not text or len(text.strip()) < 20
+    
+    def _detect_payment_requests(self, text, findings):
         """Detect payment request language"""
         found = []
         for keyword in self.SCAM_KEYWORDS['payment_requests']:
@@ -146,8 +187,8 @@ class ScamTextAnalyzer:
                 found.append(keyword)
         
         if found:
-            self.scam_indicators.append(f"Payment requests detected: {', '.join(found[:3])}")
-            self.risk_factors.append({
+            findings.scam_indicators.append(f"Payment requests detected: {', '.join(found[:3])}")
+            findings.risk_factors.append({
                 'type': 'Payment Request',
                 'severity': 'HIGH',
                 'description': 'Legitimate employers never ask for upfront payments'
@@ -155,7 +196,7 @@ class ScamTextAnalyzer:
         
         return len(found) / 3  # Normalize to 0-1
     
-    def _detect_unrealistic_claims(self, text):
+    def _detect_unrealistic_claims(self, text, findings):
         """Detect unrealistic promises"""
         found = []
         for keyword in self.SCAM_KEYWORDS['unrealistic_promises']:
@@ -163,8 +204,8 @@ class ScamTextAnalyzer:
                 found.append(keyword)
         
         if found:
-            self.scam_indicators.append(f"Unrealistic promises: {', '.join(found[:2])}")
-            self.risk_factors.append({
+            findings.scam_indicators.append(f"Unrealistic promises: {', '.join(found[:2])}")
+            findings.risk_factors.append({
                 'type': 'Unrealistic Claims',
                 'severity': 'HIGH',
                 'description': 'Claims sound too good to be true'
@@ -172,7 +213,7 @@ class ScamTextAnalyzer:
         
         return min(1.0, len(found) / 2)
     
-    def _detect_urgency_tactics(self, text):
+    def _detect_urgency_tactics(self, text, findings):
         """Detect urgency and pressure tactics"""
         found = []
         for keyword in self.SCAM_KEYWORDS['urgency_tactics']:
@@ -180,8 +221,8 @@ class ScamTextAnalyzer:
                 found.append(keyword)
         
         if len(found) >= 2:
-            self.scam_indicators.append("Excessive urgency language detected")
-            self.risk_factors.append({
+            findings.scam_indicators.append("Excessive urgency language detected")
+            findings.risk_factors.append({
                 'type': 'Pressure Tactics',
                 'severity': 'MEDIUM',
                 'description': 'Scammers use urgency to prevent careful consideration'
@@ -189,7 +230,7 @@ class ScamTextAnalyzer:
         
         return min(1.0, len(found) / 3)
     
-    def _detect_vague_language(self, text):
+    def _detect_vague_language(self, text, findings):
         """Detect vague and non-specific language"""
         found = []
         for keyword in self.SCAM_KEYWORDS['vague_language']:
@@ -197,8 +238,8 @@ class ScamTextAnalyzer:
                 found.append(keyword)
         
         if found:
-            self.scam_indicators.append("Vague job description")
-            self.risk_factors.append({
+            findings.scam_indicators.append("Vague job description")
+            findings.risk_factors.append({
                 'type': 'Vague Information',
                 'severity': 'MEDIUM',
                 'description': 'Lacks specific job details and responsibilities'
@@ -206,7 +247,7 @@ class ScamTextAnalyzer:
         
         return min(1.0, len(found) / 2)
     
-    def _detect_suspicious_contact(self, text):
+    def _detect_suspicious_contact(self, text, findings):
         """Detect suspicious contact methods"""
         found = []
         for keyword in self.SCAM_KEYWORDS['suspicious_contact']:
@@ -214,8 +255,8 @@ class ScamTextAnalyzer:
                 found.append(keyword)
         
         if found:
-            self.scam_indicators.append("Suspicious contact methods (personal email/messaging apps)")
-            self.risk_factors.append({
+            findings.scam_indicators.append("Suspicious contact methods (personal email/messaging apps)")
+            findings.risk_factors.append({
                 'type': 'Contact Method',
                 'severity': 'HIGH',
                 'description': 'Professional companies use official communication channels'
@@ -235,49 +276,48 @@ class ScamTextAnalyzer:
             if keyword in text:
                 score += 3
         
-        self.credibility_score = min(100, score)
-        return self.credibility_score
+        return min(100, score)
     
-    def _analyze_text_quality(self, text):
+    def _analyze_text_quality(self, text, findings):
         """Analyze text length and structure"""
         length = len(text)
         
         if length < 100:
-            self.scam_indicators.append("Very short job description")
+            findings.scam_indicators.append("Very short job description")
             return 0.8
         elif length < 200:
-            self.scam_indicators.append("Brief job description")
+            findings.scam_indicators.append("Brief job description")
             return 0.5
         elif length > 3000:
             return 0.2
         
         return 0.0
     
-    def _analyze_grammar_capitalization(self, text):
+    def _analyze_grammar_capitalization(self, text, findings):
         """Analyze grammar and capitalization issues"""
         # Check for excessive capitalization
         caps_ratio = sum(1 for c in text if c.isupper()) / max(len(text), 1)
         
         if caps_ratio > 0.3:
-            self.scam_indicators.append("Excessive capitalization")
+            findings.scam_indicators.append("Excessive capitalization")
             return 0.6
         
         # Check for multiple exclamation marks
         exclamation_count = text.count('!')
         if exclamation_count > 3:
-            self.scam_indicators.append("Excessive exclamation marks")
+            findings.scam_indicators.append("Excessive exclamation marks")
             return 0.4
         
         return 0.0
     
-    def _detect_email_phone_patterns(self, text):
+    def _detect_email_phone_patterns(self, text, findings):
         """Detect email and phone number patterns"""
         # Check for personal email domains
         personal_domains = ['gmail', 'yahoo', 'hotmail', 'outlook']
         for domain in personal_domains:
             if f'@{domain}' in text:
-                self.scam_indicators.append(f"Personal email domain detected ({domain})")
-                self.risk_factors.append({
+                findings.scam_indicators.append(f"Personal email domain detected ({domain})")
+                findings.risk_factors.append({
                     'type': 'Email Domain',
                     'severity': 'MEDIUM',
                     'description': 'Uses personal email instead of company domain'
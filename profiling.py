@@ -0,0 +1,114 @@
+"""
+Request Stage Profiling
+Nanosecond stage timings for the request being handled, recorded from any
+layer (routes, EnsembleEngine, text analysis) through a context variable,
+plus sampled cProfile captures of slow requests
+"""
+
+import cProfile
+import itertools
+import os
+import time
+from contextvars import ContextVar
+
+# StageTimer of the current request, or None when timings were not requested
+_current = ContextVar('stage_timer', default=None)
+_profile_sequence = itertools.count()
+
+
+class StageTimer:
+    """Accumulates {stage: nanoseconds} for one request"""
+
+    def __init__(self):
+        self.started_ns = time.perf_counter_ns()
+        self.stages = {}
+
+    def record(self, name, elapsed_ns):
+        self.stages[name] = self.stages.get(name, 0) + elapsed_ns
+
+    def as_dict(self):
+        return {
+            'unit': 'ns',
+            'total': time.perf_counter_ns() - self.started_ns,
+            'stages': dict(self.stages)
+        }
+
+    def server_timing(self):
+        """Server-Timing header value (durations in ms)"""
+        return ', '.join(
+            f'{name.replace(":", "-")};dur={elapsed_ns / 1e6:.3f}' for name, elapsed_ns in self.stages.items()
+        )
+
+
+class _Stage:
+    __slots__ = ('timer', 'name', 'started_ns')
+
+    def __init__(self, timer, name):
+        self.timer = timer
+        self.name = name
+
+    def __enter__(self):
+        self.started_ns = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.timer.record(self.name, time.perf_counter_ns() - self.started_ns)
+        return False
+
+
+class _NoStage:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NO_STAGE = _NoStage()
+
+
+def start():
+    """Begin timing the current request; returns the token for finish()"""
+    return _current.set(StageTimer())
+
+
+def finish(token):
+    _current.reset(token)
+
+
+def current():
+    return _current.get()
+
+
+def stage(name):
+    """Context manager timing a stage of the current request (no-op when not profiling)"""
+    timer = _current.get()
+    return _NO_STAGE if timer is None else _Stage(timer, name)
+
+
+def record(name, elapsed_ns):
+    """Add an externally measured duration to the current request's stages"""
+    timer = _current.get()
+    if timer is not None:
+        timer.record(name, elapsed_ns)
+
+
+def start_profile():
+    """Enable a cProfile.Profile for this thread, or None if another profiler is active"""
+    profile = cProfile.Profile()
+    try:
+        profile.enable()
+    except ValueError:
+        return None
+    return profile
+
+
+def save_profile(profile, directory, label, elapsed_ms):
+    """Write a .prof file (load with pstats / snakeviz) named after the request"""
+    os.makedirs(directory, exist_ok=True)
+    safe_label = ''.join(c if c.isalnum() or c in '-_' else '_' for c in label).strip('_') or 'request'
+    path = os.path.join(directory, f'{time.strftime("%Y%m%d-%H%M%S")}_{safe_label}_{elapsed_ms:.0f}ms_{os.getpid()}-{next(_profile_sequence)}.prof')
+    profile.dump_stats(path)
+    return path
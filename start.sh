@@ -2,6 +2,8 @@
 
 # Quick Start Script for Linux/Mac
 # Run this script to set up and start both backend and frontend
+# Usage: ./start.sh [--asgi | --prefork]   (--asgi serves the API through asgi.py with uvicorn,
+#        --prefork through gunicorn.conf.py: shared models, one worker per core)
 
 echo "================================"
 echo "   ML Scam Detection System    "
@@ -9,6 +11,17 @@ echo "   React + Flask Setup          "
 echo "================================"
 echo ""
 
+# Backend server: Flask dev server by default, ASGI (uvicorn) with --asgi,
+# pre-fork gunicorn with --prefork
+BACKEND_MODE=flask
+for arg in "$@"; do
+    if [ "$arg" = "--asgi" ]; then
+        BACKEND_MODE=asgi
+    elif [ "$arg" = "--prefork" ]; then
+        BACKEND_MODE=prefork
+    fi
+done
+
 # Colors
 RED='\033[0;31m'
 GREEN='\033[0;32m'
@@ -109,16 +122,24 @@ echo ""
 echo -e "${YELLOW}Press Ctrl+C in each terminal to stop the servers${NC}"
 echo ""
 
+if [ "$BACKEND_MODE" = "asgi" ]; then
+    BACKEND_CMD="$PYTHON_CMD -m uvicorn asgi:app --host 0.0.0.0 --port 5000"
+elif [ "$BACKEND_MODE" = "prefork" ]; then
+    BACKEND_CMD="gunicorn -c gunicorn.conf.py app:app"
+else
+    BACKEND_CMD="$PYTHON_CMD app.py"
+fi
+
 # Start backend in new terminal (using gnome-terminal, xterm, or konsole)
-echo -e "${YELLOW}Starting Flask backend...${NC}"
+echo -e "${YELLOW}Starting Flask backend ($BACKEND_MODE)...${NC}"
 if command -v gnome-terminal &> /dev/null; then
-    gnome-terminal -- bash -c "source venv/bin/activate; $PYTHON_CMD app.py; exec bash"
+    gnome-terminal -- bash -c "source venv/bin/activate; $BACKEND_CMD; exec bash"
 elif command -v xterm &> /dev/null; then
-    xterm -e "source venv/bin/activate; $PYTHON_CMD app.py; exec bash" &
+    xterm -e "source venv/bin/activate; $BACKEND_CMD; exec bash" &
 elif command -v konsole &> /dev/null; then
-    konsole -e "source venv/bin/activate; $PYTHON_CMD app.py; exec bash" &
+    konsole -e "source venv/bin/activate; $BACKEND_CMD; exec bash" &
 else
-    echo -e "${YELLOW}Could not detect terminal. Run manually: $PYTHON_CMD app.py${NC}"
+    echo -e "${YELLOW}Could not detect terminal. Run manually: $BACKEND_CMD${NC}"
 fi
 
 # Wait a bit for backend to start
@@ -0,0 +1,99 @@
+"""
+Structured Logging
+JSON log records handed to a background writer thread through a bounded
+queue, with per-route sampling. Records are formatted on the writer thread,
+and dropped rather than blocking the request when the queue is full.
+"""
+
+import atexit
+import json
+import logging
+import os
+import queue
+import random
+import sys
+import time
+from logging.handlers import QueueHandler, QueueListener
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line; structured fields come from extra={'fields': {...}}"""
+
+    def format(self, record):
+        entry = {
+            'ts': time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(record.created)) + f'.{int(record.msecs):03d}Z',
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage()
+        }
+        fields = getattr(record, 'fields', None)
+        if fields:
+            entry.update(fields)
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """
+    QueueHandler that neither formats nor blocks in the calling thread
+
+    The stock handler formats the message before enqueueing; here the record
+    is queued as-is and the listener's formatter does the work. A full queue
+    drops the record and counts it.
+    """
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class RouteSampler:
+    """Decides per request whether a route's records are logged"""
+
+    def __init__(self, default_rate=1.0, rates=None):
+        self.default_rate = default_rate
+        self.rates = dict(rates or {})
+
+    def sampled(self, route):
+        rate = self.rates.get(route, self.default_rate)
+        return rate >= 1 or (rate > 0 and random.random() < rate)
+
+
+def configure(name, level='INFO', queue_size=10000, stream=None):
+    """
+    Logger writing JSON lines to `stream` (stdout by default) from a background thread
+
+    Returns (logger, handler); handler.dropped counts records lost to a full queue.
+    """
+    handler = NonBlockingQueueHandler(queue.Queue(maxsize=queue_size))
+    writer = logging.StreamHandler(stream or sys.stdout)
+    writer.setFormatter(JsonFormatter())
+    _start_listener(handler, writer)
+    # The writer thread does not survive fork; forked workers start their own
+    os.register_at_fork(after_in_child=lambda: _start_listener(handler, writer))
+
+    logger = logging.getLogger(name)
+    logger.setLevel(level)
+    logger.handlers = [handler]
+    logger.propagate = False
+    return logger, handler
+
+
+def _start_listener(handler, writer):
+    """Give the handler a fresh queue and writer thread"""
+    # A queue inherited across fork may hold a lock taken by the parent's writer
+    handler.queue = queue.Queue(maxsize=handler.queue.maxsize)
+    handler.listener = QueueListener(handler.queue, writer)
+    handler.listener.start()
+    # Flush what is still queued on interpreter exit
+    atexit.register(handler.listener.stop)
@@ -0,0 +1,157 @@
+"""
+Synthetic Datasets
+Job and internship posting generators used to train the models
+(train_models.py) and to warm up the API before it reports ready
+"""
+
+import numpy as np
+import pandas as pd
+
+# Generate synthetic job dataset
+def generate_job_dataset(n_samples=1500):
+    rng = np.random.RandomState(123)  # Different seed for job data; leaves the global RNG alone
+    
+    # More realistic feature generation
+    data = {
+        'salary_min': np.concatenate([
+            rng.normal(45000, 15000, int(n_samples*0.7)),  # Normal jobs
+            rng.uniform(5000, 25000, int(n_samples*0.3))   # Suspicious low salaries
+        ]),
+        'salary_max': [],
+        'company_experience_years': np.concatenate([
+            rng.normal(12, 8, int(n_samples*0.8)),          # Established companies
+            rng.uniform(0, 3, int(n_samples*0.2))           # New/fake companies
+        ]),
+        'job_description_length': np.concatenate([
+            rng.normal(800, 300, int(n_samples*0.75)),      # Detailed descriptions
+            rng.uniform(50, 200, int(n_samples*0.25))       # Short/lazy descriptions
+        ]),
+        'required_experience_years': np.concatenate([
+            rng.poisson(3, int(n_samples*0.8)),             # Reasonable requirements  
+            rng.uniform(10, 25, int(n_samples*0.2))         # Unrealistic requirements
+        ]),
+        'required_education_level': rng.choice([1,2,3,4], n_samples, p=[0.2, 0.5, 0.25, 0.05]),
+        'telecommute_allowed': rng.choice([0,1], n_samples, p=[0.6, 0.4]),
+        'has_company_logo': rng.choice([0,1], n_samples, p=[0.15, 0.85]),
+    }
+    
+    # Generate salary_max relative to salary_min
+    data['salary_max'] = []
+    for min_sal in data['salary_min']:
+        if min_sal < 20000:  # Suspicious jobs
+            max_sal = rng.uniform(min_sal + 5000, min_sal + 50000)
+        else:  # Normal jobs
+            max_sal = rng.uniform(min_sal + 5000, min_sal + 30000)
+        data['salary_max'].append(max_sal)
+    
+    # Ensure non-negative values and reasonable ranges
+    data['salary_min'] = np.clip(data['salary_min'], 1000, 200000)
+    data['salary_max'] = np.clip(data['salary_max'], 2000, 250000) 
+    data['company_experience_years'] = np.clip(data['company_experience_years'], 0, 50).astype(int)
+    data['job_description_length'] = np.clip(data['job_description_length'], 20, 3000).astype(int)
+    data['required_experience_years'] = np.clip(data['required_experience_years'], 0, 20).astype(int)
+    
+    # Create features dataframe
+    df = pd.DataFrame(data)
+    
+    # More sophisticated fraud detection rules
+    fraud_score = np.zeros(len(df))
+    
+    # Salary red flags
+    fraud_score += (df['salary_min'] < 18000).astype(int) * 2  # Very low minimum
+    fraud_score += ((df['salary_max'] - df['salary_min']) > 80000).astype(int) * 2  # Unrealistic range
+    fraud_score += (df['salary_max'] > 200000).astype(int) * 1  # Suspiciously high
+    
+    # Company credibility
+    fraud_score += ((df['company_experience_years'] < 2) & (df['has_company_logo'] == 0)).astype(int) * 3
+    fraud_score += (df['company_experience_years'] == 0).astype(int) * 2
+    
+    # Job description quality
+    fraud_score += (df['job_description_length'] < 150).astype(int) * 2
+    fraud_score += (df['job_description_length'] > 2500).astype(int) * 1
+    
+    # Experience requirements
+    fraud_score += (df['required_experience_years'] > 15).astype(int) * 2
+    fraud_score += ((df['required_experience_years'] > 10) & (df['salary_min'] < 30000)).astype(int) * 2
+    
+    # Education vs salary mismatch
+    fraud_score += ((df['required_education_level'] >= 3) & (df['salary_min'] < 25000)).astype(int) * 1
+    
+    # Convert fraud score to label (threshold-based with noise)
+    df['label'] = (fraud_score >= 3).astype(int)
+    
+    # Add realistic noise (15% chance of flipping)
+    noise_indices = rng.choice(df.index, size=int(0.15 * len(df)), replace=False)
+    df.loc[noise_indices, 'label'] = 1 - df.loc[noise_indices, 'label']
+    
+    return df
+
+# Generate synthetic internship dataset
+def generate_internship_dataset(n_samples=1500):
+    rng = np.random.RandomState(456)  # Different seed for internship data; leaves the global RNG alone
+    
+    # More realistic feature generation
+    data = {
+        'company_registered': rng.choice([0,1], n_samples, p=[0.1, 0.9]),  # Most companies registered
+        'official_email': rng.choice([0,1], n_samples, p=[0.2, 0.8]),  # Most have official emails
+        'website_available': rng.choice([0,1], n_samples, p=[0.15, 0.85]),  # Most have websites
+        'stipend_offered': rng.choice([0,1], n_samples, p=[0.3, 0.7]),  # Many offer stipends
+        'stipend_amount': [],
+        'registration_fee': [],
+        'interview_process': rng.choice([0,1], n_samples, p=[0.25, 0.75]),  # Most have interviews
+        'duration_months': rng.choice([1,2,3,4,6,8,12], n_samples, p=[0.1,0.15,0.25,0.2,0.2,0.05,0.05]),
+        'job_description_quality': rng.choice([1,2,3,4,5], n_samples, p=[0.05,0.1,0.3,0.4,0.15]),
+        'social_media_presence': rng.choice([0,1,2], n_samples, p=[0.2, 0.5, 0.3]),  # Fixed field name
+    }
+    
+    # Generate stipend amounts based on whether stipend is offered
+    stipend_offers = data['stipend_offered']
+    for offer in stipend_offers:
+        if offer == 1:  # Stipend offered
+            amount = rng.normal(8000, 3000)  # Normal internship stipends
+            if rng.random() < 0.1:  # 10% chance of suspicious high stipend
+                amount = rng.uniform(25000, 100000)  
+        else:
+            amount = 0
+        data['stipend_amount'].append(max(0, amount))
+    
+    # Generate registration fees (most legitimate internships = $0)
+    for i in range(n_samples):
+        if rng.random() < 0.8:  # 80% no fee (legitimate)
+            fee = 0
+        elif rng.random() < 0.9:  # Small processing fee
+            fee = rng.uniform(50, 500) 
+        else:  # Suspicious high fees
+            fee = rng.uniform(1000, 10000)
+        data['registration_fee'].append(fee)
+    
+    df = pd.DataFrame(data)
+    
+    # Sophisticated fraud scoring
+    fraud_score = np.zeros(len(df))
+    
+    # Company legitimacy indicators 
+    fraud_score += (df['company_registered'] == 0).astype(int) * 4  # Major red flag
+    fraud_score += (df['official_email'] == 0).astype(int) * 3
+    fraud_score += (df['website_available'] == 0).astype(int) * 2
+    fraud_score += (df['social_media_presence'] == 0).astype(int) * 1
+    
+    # Financial red flags
+    fraud_score += (df['registration_fee'] > 2000).astype(int) * 4  # High reg fee = major red flag
+    fraud_score += ((df['registration_fee'] > 500) & (df['registration_fee'] <= 2000)).astype(int) * 2  
+    fraud_score += (df['stipend_amount'] > 20000).astype(int) * 3  # Unrealistic stipend
+    fraud_score += ((df['stipend_offered'] == 0) & (df['registration_fee'] > 0)).astype(int) * 2  # No pay but fees
+    
+    # Process quality indicators
+    fraud_score += (df['interview_process'] == 0).astype(int) * 1
+    fraud_score += (df['job_description_quality'] <= 2).astype(int) * 2
+    fraud_score += (df['duration_months'] > 10).astype(int) * 1  # Unusually long
+    
+    # Convert to labels
+    df['label'] = (fraud_score >= 4).astype(int)  # Threshold for fraud
+    
+    # Add realistic noise
+    noise_indices = rng.choice(df.index, size=int(0.12 * len(df)), replace=False)
+    df.loc[noise_indices, 'label'] = 1 - df.loc[noise_indices, 'label']
+    
+    return df
@@ -1,4 +1,3 @@
-import pandas as pd
 import numpy as np
 from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import StandardScaler
@@ -7,166 +6,42 @@ from sklearn.tree import DecisionTreeClassifier
 from xgboost import XGBClassifier
 from catboost import CatBoostClassifier
 from sklearn.svm import SVC
-from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score
+from sklearn.metrics import accuracy_score
 import joblib
 import os
-
-# Create models directory
-os.makedirs('models', exist_ok=True)
+from datetime import datetime
+from ensemble import ENSEMBLES, EnsembleEngine, load_models
+from feature_schema import INTERNSHIP_SCHEMA, JOB_SCHEMA
+from lookup_table import build_lookup, grid_size, grid_values, verify_lookup
+from synthetic_data import generate_internship_dataset, generate_job_dataset
+from tree_compiler import compile_model, verify_compiled
+
+# Largest allowed |compiled - library| fraud probability on the test split
+COMPILE_TOLERANCE = 1e-5
+
+# Size of the student models served by mode=fast
+STUDENT_TREES = 100
+STUDENT_DEPTH = 3
+
+# Internship lookup table: precompute results for every posting whose features
+# all take values held by at least LOOKUP_MIN_SHARE of the training rows
+LOOKUP_MIN_SHARE = 0.01
+LOOKUP_MAX_CELLS = 100000
+
+# Fold each StandardScaler into the compiled split thresholds, so tree
+# members are served raw feature values and skip the scaler entirely
+FOLD_SCALERS = True
+
+# Every run writes a new bundle to models/<version>/ and publishes it through
+# models/CURRENT once all artifacts are on disk (servers can hot reload it)
+MODEL_VERSION = datetime.now().strftime('%Y%m%d-%H%M%S')
+MODEL_DIR = os.path.join('models', MODEL_VERSION)
+os.makedirs(MODEL_DIR, exist_ok=True)
 
 print("=" * 60)
 print("FAKE JOB RECRUITMENT DETECTION - DATASET & MODEL TRAINING")
 print("=" * 60)
 
-# Generate synthetic job dataset
-def generate_job_dataset(n_samples=1500):
-    np.random.seed(123)  # Different seed for job data
-    
-    # More realistic feature generation
-    data = {
-        'salary_min': np.concatenate([
-            np.random.normal(45000, 15000, int(n_samples*0.7)),  # Normal jobs
-            np.random.uniform(5000, 25000, int(n_samples*0.3))   # Suspicious low salaries
-        ]),
-        'salary_max': [],
-        'company_experience_years': np.concatenate([
-            np.random.normal(12, 8, int(n_samples*0.8)),          # Established companies
-            np.random.uniform(0, 3, int(n_samples*0.2))           # New/fake companies
-        ]),
-        'job_description_length': np.concatenate([
-            np.random.normal(800, 300, int(n_samples*0.75)),      # Detailed descriptions
-            np.random.uniform(50, 200, int(n_samples*0.25))       # Short/lazy descriptions
-        ]),
-        'required_experience_years': np.concatenate([
-            np.random.poisson(3, int(n_samples*0.8)),             # Reasonable requirements  
-            np.random.uniform(10, 25, int(n_samples*0.2))         # Unrealistic requirements
-        ]),
-        'required_education_level': np.random.choice([1,2,3,4], n_samples, p=[0.2, 0.5, 0.25, 0.05]),
-        'telecommute_allowed': np.random.choice([0,1], n_samples, p=[0.6, 0.4]),
-        'has_company_logo': np.random.choice([0,1], n_samples, p=[0.15, 0.85]),
-    }
-    
-    # Generate salary_max relative to salary_min
-    data['salary_max'] = []
-    for min_sal in data['salary_min']:
-        if min_sal < 20000:  # Suspicious jobs
-            max_sal = np.random.uniform(min_sal + 5000, min_sal + 50000)
-        else:  # Normal jobs
-            max_sal = np.random.uniform(min_sal + 5000, min_sal + 30000)
-        data['salary_max'].append(max_sal)
-    
-    # Ensure non-negative values and reasonable ranges
-    data['salary_min'] = np.clip(data['salary_min'], 1000, 200000)
-    data['salary_max'] = np.clip(data['salary_max'], 2000, 250000) 
-    data['company_experience_years'] = np.clip(data['company_experience_years'], 0, 50).astype(int)
-    data['job_description_length'] = np.clip(data['job_description_length'], 20, 3000).astype(int)
-    data['required_experience_years'] = np.clip(data['required_experience_years'], 0, 20).astype(int)
-    
-    # Create features dataframe
-    df = pd.DataFrame(data)
-    
-    # More sophisticated fraud detection rules
-    fraud_score = np.zeros(len(df))
-    
-    # Salary red flags
-    fraud_score += (df['salary_min'] < 18000).astype(int) * 2  # Very low minimum
-    fraud_score += ((df['salary_max'] - df['salary_min']) > 80000).astype(int) * 2  # Unrealistic range
-    fraud_score += (df['salary_max'] > 200000).astype(int) * 1  # Suspiciously high
-    
-    # Company credibility
-    fraud_score += ((df['company_experience_years'] < 2) & (df['has_company_logo'] == 0)).astype(int) * 3
-    fraud_score += (df['company_experience_years'] == 0).astype(int) * 2
-    
-    # Job description quality
-    fraud_score += (df['job_description_length'] < 150).astype(int) * 2
-    fraud_score += (df['job_description_length'] > 2500).astype(int) * 1
-    
-    # Experience requirements
-    fraud_score += (df['required_experience_years'] > 15).astype(int) * 2
-    fraud_score += ((df['required_experience_years'] > 10) & (df['salary_min'] < 30000)).astype(int) * 2
-    
-    # Education vs salary mismatch
-    fraud_score += ((df['required_education_level'] >= 3) & (df['salary_min'] < 25000)).astype(int) * 1
-    
-    # Convert fraud score to label (threshold-based with noise)
-    df['label'] = (fraud_score >= 3).astype(int)
-    
-    # Add realistic noise (15% chance of flipping)
-    noise_indices = np.random.choice(df.index, size=int(0.15 * len(df)), replace=False)
-    df.loc[noise_indices, 'label'] = 1 - df.loc[noise_indices, 'label']
-    
-    return df
-
-# Generate synthetic internship dataset
-def generate_internship_dataset(n_samples=1500):
-    np.random.seed(456)  # Different seed for internship data
-    
-    # More realistic feature generation
-    data = {
-        'company_registered': np.random.choice([0,1], n_samples, p=[0.1, 0.9]),  # Most companies registered
-        'official_email': np.random.choice([0,1], n_samples, p=[0.2, 0.8]),  # Most have official emails
-        'website_available': np.random.choice([0,1], n_samples, p=[0.15, 0.85]),  # Most have websites
-        'stipend_offered': np.random.choice([0,1], n_samples, p=[0.3, 0.7]),  # Many offer stipends
-        'stipend_amount': [],
-        'registration_fee': [],
-        'interview_process': np.random.choice([0,1], n_samples, p=[0.25, 0.75]),  # Most have interviews
-        'duration_months': np.random.choice([1,2,3,4,6,8,12], n_samples, p=[0.1,0.15,0.25,0.2,0.2,0.05,0.05]),
-        'job_description_quality': np.random.choice([1,2,3,4,5], n_samples, p=[0.05,0.1,0.3,0.4,0.15]),
-        'social_media_presence': np.random.choice([0,1,2], n_samples, p=[0.2, 0.5, 0.3]),  # Fixed field name
-    }
-    
-    # Generate stipend amounts based on whether stipend is offered
-    stipend_offers = data['stipend_offered']
-    for offer in stipend_offers:
-        if offer == 1:  # Stipend offered
-            amount = np.random.normal(8000, 3000)  # Normal internship stipends
-            if np.random.random() < 0.1:  # 10% chance of suspicious high stipend
-                amount = np.random.uniform(25000, 100000)  
-        else:
-            amount = 0
-        data['stipend_amount'].append(max(0, amount))
-    
-    # Generate registration fees (most legitimate internships = $0)
-    for i in range(n_samples):
-        if np.random.random() < 0.8:  # 80% no fee (legitimate)
-            fee = 0
-        elif np.random.random() < 0.9:  # Small processing fee
-            fee = np.random.uniform(50, 500) 
-        else:  # Suspicious high fees
-            fee = np.random.uniform(1000, 10000)
-        data['registration_fee'].append(fee)
-    
-    df = pd.DataFrame(data)
-    
-    # Sophisticated fraud scoring
-    fraud_score = np.zeros(len(df))
-    
-    # Company legitimacy indicators 
-    fraud_score += (df['company_registered'] == 0).astype(int) * 4  # Major red flag
-    fraud_score += (df['official_email'] == 0).astype(int) * 3
-    fraud_score += (df['website_available'] == 0).astype(int) * 2
-    fraud_score += (df['social_media_presence'] == 0).astype(int) * 1
-    
-    # Financial red flags
-    fraud_score += (df['registration_fee'] > 2000).astype(int) * 4  # High reg fee = major red flag
-    fraud_score += ((df['registration_fee'] > 500) & (df['registration_fee'] <= 2000)).astype(int) * 2  
-    fraud_score += (df['stipend_amount'] > 20000).astype(int) * 3  # Unrealistic stipend
-    fraud_score += ((df['stipend_offered'] == 0) & (df['registration_fee'] > 0)).astype(int) * 2  # No pay but fees
-    
-    # Process quality indicators
-    fraud_score += (df['interview_process'] == 0).astype(int) * 1
-    fraud_score += (df['job_description_quality'] <= 2).astype(int) * 2
-    fraud_score += (df['duration_months'] > 10).astype(int) * 1  # Unusually long
-    
-    # Convert to labels
-    df['label'] = (fraud_score >= 4).astype(int)  # Threshold for fraud
-    
-    # Add realistic noise
-    noise_indices = np.random.choice(df.index, size=int(0.12 * len(df)), replace=False)
-    df.loc[noise_indices, 'label'] = 1 - df.loc[noise_indices, 'label']
-    
-    return df
-
 # Train job detection models
 print("\nGenerating Job Dataset...")
 job_df = generate_job_dataset(n_samples=3000)  # Increased sample size
@@ -178,8 +53,11 @@ print(f"Real jobs: {(job_df['label'] == 0).sum()} ({((job_df['label'] == 0).sum(
 job_df.to_csv('jobs_dataset.csv', index=False)
 print("Job dataset saved to 'jobs_dataset.csv'")
 
-X_job = job_df.drop('label', axis=1)
+# Columns in the schema order the API serves the models with
+X_job = job_df[JOB_SCHEMA.names]
 y_job = job_df['label']
+if JOB_SCHEMA.range_errors(X_job):
+    raise ValueError("Job dataset has values outside the feature schema ranges")
 
 X_train_job, X_test_job, y_train_job, y_test_job = train_test_split(
     X_job, y_job, test_size=0.2, random_state=42
@@ -237,14 +115,14 @@ y_pred = dt_job.predict(X_test_job_scaled)
 print(f"Decision Tree Accuracy: {accuracy_score(y_test_job, y_pred):.4f}")
 
 # Save job models
-joblib.dump(xgb_job, 'models/job_xgboost.pkl')
-joblib.dump(catb_job, 'models/job_catboost.pkl')
-joblib.dump(gb_job, 'models/job_gradient_boost.pkl')
-joblib.dump(rf_job, 'models/job_random_forest.pkl')
-joblib.dump(dt_job, 'models/job_decision_tree.pkl')
-joblib.dump(scaler_job, 'models/job_scaler.pkl')
+joblib.dump(xgb_job, os.path.join(MODEL_DIR, 'job_xgboost.pkl'))
+joblib.dump(catb_job, os.path.join(MODEL_DIR, 'job_catboost.pkl'))
+joblib.dump(gb_job, os.path.join(MODEL_DIR, 'job_gradient_boost.pkl'))
+joblib.dump(rf_job, os.path.join(MODEL_DIR, 'job_random_forest.pkl'))
+joblib.dump(dt_job, os.path.join(MODEL_DIR, 'job_decision_tree.pkl'))
+joblib.dump(scaler_job, os.path.join(MODEL_DIR, 'job_scaler.pkl'))
 
-print("\n✓ Job models saved to 'models/' directory")
+print(f"\n✓ Job models saved to '{MODEL_DIR}/' directory")
 
 # Train internship detection models
 print("\n" + "=" * 60)
@@ -261,8 +139,11 @@ print(f"Real internships: {(internship_df['label'] == 0).sum()} ({((internship_d
 internship_df.to_csv('internships_dataset.csv', index=False)
 print("Internship dataset saved to 'internships_dataset.csv'")
 
-X_internship = internship_df.drop('label', axis=1)
+# Columns in the schema order the API serves the models with
+X_internship = internship_df[INTERNSHIP_SCHEMA.names]
 y_internship = internship_df['label']
+if INTERNSHIP_SCHEMA.range_errors(X_internship):
+    raise ValueError("Internship dataset has values outside the feature schema ranges")
 
 X_train_int, X_test_int, y_train_int, y_test_int = train_test_split(
     X_internship, y_internship, test_size=0.2, random_state=42
@@ -304,12 +185,133 @@ y_pred = xgb_int.predict(X_test_int_scaled)
 print(f"XGBoost Accuracy: {accuracy_score(y_test_int, y_pred):.4f}")
 
 # Save internship models
-joblib.dump(svm_int, 'models/internship_svm.pkl')
-joblib.dump(rf_int, 'models/internship_random_forest.pkl')
-joblib.dump(xgb_int, 'models/internship_xgboost.pkl')
-joblib.dump(scaler_int, 'models/internship_scaler.pkl')
+joblib.dump(svm_int, os.path.join(MODEL_DIR, 'internship_svm.pkl'))
+joblib.dump(rf_int, os.path.join(MODEL_DIR, 'internship_random_forest.pkl'))
+joblib.dump(xgb_int, os.path.join(MODEL_DIR, 'internship_xgboost.pkl'))
+joblib.dump(scaler_int, os.path.join(MODEL_DIR, 'internship_scaler.pkl'))
+
+print(f"\n✓ Internship models saved to '{MODEL_DIR}/' directory")
+
+# Distill each ensemble into one student model for mode=fast
+print("\n" + "-" * 60)
+print("Distilling Student Models...")
+print("-" * 60)
+
+teacher = EnsembleEngine({
+    'job_xgboost': xgb_job, 'job_catboost': catb_job, 'job_gradient_boost': gb_job,
+    'job_random_forest': rf_job, 'job_decision_tree': dt_job, 'job_scaler': scaler_job,
+    'internship_svm': svm_int, 'internship_random_forest': rf_int, 'internship_xgboost': xgb_int,
+    'internship_scaler': scaler_int
+}, compiled_max_rows=0)
+
+def vote_share(name, X):
+    """Fraction of the ensemble's members voting fraudulent, per row"""
+    features = X[ENSEMBLES[name]['schema'].names].to_numpy(dtype=float)
+    return np.mean([fraud for _, fraud, _, _ in teacher.member_outputs(name, features)], axis=0)
+
+def distill(name, X_train, X_train_scaled, X_test, X_test_scaled, y_test):
+    """
+    Fit a small gradient-boosted student to the ensemble's soft vote
+
+    Every training row appears once per label, weighted by the share of
+    members voting that way, so the student minimises cross-entropy against
+    the vote share rather than the hard majority.
+    """
+    share = vote_share(name, X_train)
+    X = np.vstack([X_train_scaled, X_train_scaled])
+    y = np.concatenate([np.zeros(len(share)), np.ones(len(share))])
+    weight = np.concatenate([1 - share, share])
+    keep = weight > 0
+    
+    student = GradientBoostingClassifier(n_estimators=STUDENT_TREES, max_depth=STUDENT_DEPTH, random_state=42)
+    student.fit(X[keep], y[keep], sample_weight=weight[keep])
+    
+    student_fraud = student.predict_proba(X_test_scaled)[:, 1] > 0.5
+    ensemble_fraud = vote_share(name, X_test) > 0.5
+    print(f"{ENSEMBLES[name]['title']} student agreement with full ensemble: {np.mean(student_fraud == ensemble_fraud):.4f}")
+    print(f"{ENSEMBLES[name]['title']} student accuracy: {accuracy_score(y_test, student_fraud):.4f} "
+          f"(ensemble {accuracy_score(y_test, ensemble_fraud):.4f})")
+    return student
+
+job_student = distill('job', X_train_job, X_train_job_scaled, X_test_job, X_test_job_scaled, y_test_job)
+int_student = distill('internship', X_train_int, X_train_int_scaled, X_test_int, X_test_int_scaled, y_test_int)
+
+joblib.dump(job_student, os.path.join(MODEL_DIR, 'job_student.pkl'))
+joblib.dump(int_student, os.path.join(MODEL_DIR, 'internship_student.pkl'))
+
+print(f"\n✓ Student models saved to '{MODEL_DIR}/' directory")
+
+# Compile tree ensembles into packed node arrays for fast inference
+print("\n" + "-" * 60)
+print("Compiling Tree Ensembles...")
+print("-" * 60)
+
+os.makedirs(os.path.join(MODEL_DIR, 'compiled'), exist_ok=True)
+
+compile_targets = [
+    ('job_xgboost', xgb_job, scaler_job, X_test_job),
+    ('job_catboost', catb_job, scaler_job, X_test_job),
+    ('job_gradient_boost', gb_job, scaler_job, X_test_job),
+    ('job_random_forest', rf_job, scaler_job, X_test_job),
+    ('job_decision_tree', dt_job, scaler_job, X_test_job),
+    ('internship_random_forest', rf_int, scaler_int, X_test_int),
+    ('internship_xgboost', xgb_int, scaler_int, X_test_int),
+    ('job_student', job_student, scaler_job, X_test_job),
+    ('internship_student', int_student, scaler_int, X_test_int),
+]
+
+for name, model, scaler, X_check in compile_targets:
+    compiled_path = os.path.join(MODEL_DIR, 'compiled', f'{name}.pkl')
+    if FOLD_SCALERS:
+        compiled = compile_model(model, scaler=scaler)
+        error = verify_compiled(compiled, model, X_check, scaler=scaler)
+    else:
+        compiled = compile_model(model)
+        error = verify_compiled(compiled, model, scaler.transform(X_check))
+    
+    if error > COMPILE_TOLERANCE:
+        # Never serve a compiled model that disagrees with its source
+        if os.path.exists(compiled_path):
+            os.remove(compiled_path)
+        print(f"✗ {name}: max probability error {error:.2e} exceeds tolerance, not exported")
+        continue
+    
+    joblib.dump(compiled, compiled_path)
+    print(f"✓ {name}: {compiled.n_trees} trees, {compiled.n_nodes} nodes, max probability error {error:.2e}")
+
+print(f"\n✓ Compiled models saved to '{MODEL_DIR}/compiled/' directory")
+
+# Precompute internship results over the grid of common feature values
+print("\n" + "-" * 60)
+print("Building Internship Lookup Table...")
+print("-" * 60)
 
-print("\n✓ Internship models saved to 'models/' directory")
+# Score through the bundle exactly as the API serves it (compiled forests included)
+bundle = EnsembleEngine(load_models(MODEL_DIR))
+lookup_features = INTERNSHIP_SCHEMA.names
+lookup_path = os.path.join(MODEL_DIR, 'internship_lookup.pkl')
+lookup_values = grid_values(X_train_int[lookup_features], min_share=LOOKUP_MIN_SHARE)
+print("Grid values: " + ", ".join(f"{feature}={len(values)}" for feature, values in zip(lookup_features, lookup_values)))
+
+if grid_size(lookup_values) > LOOKUP_MAX_CELLS:
+    print(f"✗ {grid_size(lookup_values)} grid cells exceed {LOOKUP_MAX_CELLS}, not exported")
+else:
+    table = build_lookup(bundle, 'internship', lookup_values)
+    covered, mismatches = verify_lookup(table, bundle, 'internship', X_test_int[lookup_features])
+    if mismatches:
+        # Never serve a table that disagrees with the ensemble
+        print(f"✗ {mismatches} of {covered} covered test postings differ from live scoring, not exported")
+    else:
+        joblib.dump(table, lookup_path)
+        print(f"✓ internship_lookup: {len(table)} postings, covers {covered / len(X_test_int):.1%} "
+              f"of the test split, all {covered} identical to live scoring")
+
+# Publish the new version atomically
+pointer_tmp = os.path.join('models', 'CURRENT.tmp')
+with open(pointer_tmp, 'w') as f:
+    f.write(MODEL_VERSION)
+os.replace(pointer_tmp, os.path.join('models', 'CURRENT'))
+print(f"✓ Model version {MODEL_VERSION} published to 'models/CURRENT'")
 
 print("\n" + "=" * 60)
 print("TRAINING COMPLETE!")
@@ -317,14 +319,19 @@ print("=" * 60)
 print("\nGenerated Files:")
 print("  - jobs_dataset.csv")
 print("  - internships_dataset.csv")
-print("  - models/")
+print(f"  - models/CURRENT -> {MODEL_VERSION}")
+print(f"  - {MODEL_DIR}/")
 print("    ├── job_xgboost.pkl")
 print("    ├── job_catboost.pkl")
 print("    ├── job_gradient_boost.pkl")
 print("    ├── job_random_forest.pkl")
 print("    ├── job_decision_tree.pkl")
 print("    ├── job_scaler.pkl")
+print("    ├── job_student.pkl")
 print("    ├── internship_svm.pkl")
 print("    ├── internship_random_forest.pkl")
 print("    ├── internship_xgboost.pkl")
-print("    └── internship_scaler.pkl")
+print("    ├── internship_scaler.pkl")
+print("    ├── internship_student.pkl")
+print("    ├── internship_lookup.pkl")
+print("    └── compiled/")
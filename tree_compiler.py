@@ -0,0 +1,359 @@
+"""
+Tree Ensemble Compiler
+Flattens fitted tree ensembles (scikit-learn, XGBoost, CatBoost) into packed
+node arrays and evaluates them with vectorized NumPy instead of the library
+estimators
+"""
+
+import json
+import os
+import tempfile
+import numpy as np
+
+
+def _float32_at_most(values):
+    """Largest float32 <= each value, so `x32 <= t32` matches `x32 <= value` exactly"""
+    values = np.asarray(values, dtype=np.float64)
+    rounded = values.astype(np.float32)
+    too_high = rounded.astype(np.float64) > values
+    rounded[too_high] = np.nextafter(rounded[too_high], np.float32(-np.inf))
+    return rounded
+
+
+def _float32_below(values):
+    """Largest float32 strictly below each float32 value, turning `x < t` into `x <= t'`"""
+    values = np.asarray(values, dtype=np.float32)
+    return np.nextafter(values, np.float32(-np.inf))
+
+
+class CompiledForest:
+    """
+    Tree ensemble stored as packed node arrays
+
+    Every tree lives in the same arrays; a row goes to `left` when
+    x[feature] <= threshold and to `right` otherwise. Leaves point to
+    themselves so all trees can be walked for `depth` steps in lockstep.
+
+    aggregation:
+        'mean':  fraud probability is the mean leaf value (random forest, decision tree)
+        'logit': fraud probability is sigmoid(bias + sum of leaf values) (boosting)
+
+    raw_features is True when a StandardScaler has been folded into the
+    thresholds, i.e. the forest expects unscaled feature values.
+    """
+
+    def __init__(self, feature, threshold, left, right, value, roots, depth,
+                 aggregation, bias=0.0, n_features=None, source=None, raw_features=False):
+        self.feature = np.ascontiguousarray(feature, dtype=np.int32)
+        self.threshold = np.ascontiguousarray(threshold)
+        self.left = np.ascontiguousarray(left, dtype=np.int32)
+        self.right = np.ascontiguousarray(right, dtype=np.int32)
+        self.value = np.ascontiguousarray(value, dtype=np.float64)
+        self.roots = np.ascontiguousarray(roots, dtype=np.int32)
+        self.depth = int(depth)
+        self.aggregation = aggregation
+        self.bias = float(bias)
+        self.n_features = n_features
+        self.source = source
+        self.raw_features = raw_features
+        self.classes_ = np.array([0, 1])
+
+    def __setstate__(self, state):
+        # joblib's mmap_mode hands back np.memmap arrays; plain ndarray views
+        # of the same mapping skip the subclass overhead on every indexing step
+        self.__dict__.update({
+            name: value.view(np.ndarray) if isinstance(value, np.memmap) else value
+            for name, value in state.items()
+        })
+
+    @property
+    def n_trees(self):
+        return len(self.roots)
+
+    @property
+    def n_nodes(self):
+        return len(self.feature)
+
+    @property
+    def nbytes(self):
+        return sum(array.nbytes for array in (
+            self.feature, self.threshold, self.left, self.right, self.value, self.roots
+        ))
+
+    def leaves(self, X):
+        """Leaf index reached in every tree, shape (n_rows, n_trees)"""
+        X = np.ascontiguousarray(X, dtype=self.threshold.dtype)
+        n_rows, n_columns = X.shape
+        flat = X.ravel()
+        row_offset = (np.arange(n_rows) * n_columns)[:, None]
+        nodes = np.repeat(self.roots[None, :], n_rows, axis=0)
+
+        for level in range(self.depth):
+            go_left = flat[row_offset + self.feature[nodes]] <= self.threshold[nodes]
+            next_nodes = np.where(go_left, self.left[nodes], self.right[nodes])
+            # Deep trees are rare; stop once every walk has settled on a leaf
+            if level % 4 == 3 and np.array_equal(next_nodes, nodes):
+                break
+            nodes = next_nodes
+        return nodes
+
+    def decision_function(self, X):
+        """Raw ensemble output before the probability link"""
+        leaf_values = self.value[self.leaves(X)]
+        if self.aggregation == 'mean':
+            return leaf_values.mean(axis=1)
+        return self.bias + leaf_values.sum(axis=1)
+
+    def predict_proba(self, X):
+        raw = self.decision_function(X)
+        if self.aggregation == 'logit':
+            positive = 1.0 / (1.0 + np.exp(-raw))
+        else:
+            positive = raw
+        return np.column_stack([1.0 - positive, positive])
+
+    def predict(self, X):
+        return np.argmax(self.predict_proba(X), axis=1)
+
+
+class _TreeBuilder:
+    """Accumulates trees into one set of packed arrays"""
+
+    def __init__(self):
+        self.feature, self.threshold, self.left, self.right, self.value = [], [], [], [], []
+        self.roots = []
+        self.depth = 0
+
+    def add_tree(self, feature, threshold, left, right, value, depth):
+        """Append one tree; leaves are marked with left == -1"""
+        offset = sum(len(part) for part in self.feature)
+        left = np.asarray(left, dtype=np.int64)
+        right = np.asarray(right, dtype=np.int64)
+        is_leaf = left < 0
+        own_index = np.arange(len(left)) + offset
+
+        self.feature.append(np.where(is_leaf, 0, feature))
+        self.threshold.append(np.where(is_leaf, 0, threshold).astype(np.float32))
+        self.left.append(np.where(is_leaf, own_index, left + offset))
+        self.right.append(np.where(is_leaf, own_index, right + offset))
+        self.value.append(np.where(is_leaf, value, 0.0))
+        self.roots.append(offset)
+        self.depth = max(self.depth, depth)
+
+    def build(self, aggregation, bias=0.0, n_features=None, source=None):
+        return CompiledForest(
+            feature=np.concatenate(self.feature),
+            threshold=np.concatenate(self.threshold),
+            left=np.concatenate(self.left),
+            right=np.concatenate(self.right),
+            value=np.concatenate(self.value),
+            roots=np.array(self.roots),
+            depth=self.depth,
+            aggregation=aggregation,
+            bias=bias,
+            n_features=n_features,
+            source=source
+        )
+
+
+def _tree_depth(left, right):
+    """Depth of a tree given child arrays (leaves marked with -1)"""
+    depth = np.zeros(len(left), dtype=np.int64)
+    for node in range(len(left)):
+        if left[node] >= 0:
+            depth[left[node]] = depth[node] + 1
+            depth[right[node]] = depth[node] + 1
+    return int(depth.max())
+
+
+def _add_sklearn_tree(builder, tree, leaf_value):
+    builder.add_tree(
+        feature=tree.feature,
+        threshold=_float32_at_most(tree.threshold),
+        left=tree.children_left,
+        right=tree.children_right,
+        value=leaf_value,
+        depth=tree.max_depth
+    )
+
+
+def _sklearn_class_probability(tree):
+    """Per-node probability of class 1 from a classification tree"""
+    counts = tree.value[:, 0, :]
+    return counts[:, 1] / counts.sum(axis=1)
+
+
+def _compile_sklearn_forest(model):
+    estimators = getattr(model, 'estimators_', [model])
+    builder = _TreeBuilder()
+    for estimator in estimators:
+        _add_sklearn_tree(builder, estimator.tree_, _sklearn_class_probability(estimator.tree_))
+    return builder.build('mean', n_features=model.n_features_in_, source=type(model).__name__)
+
+
+def _compile_sklearn_boosting(model):
+    builder = _TreeBuilder()
+    for estimator in model.estimators_[:, 0]:
+        tree = estimator.tree_
+        _add_sklearn_tree(builder, tree, tree.value[:, 0, 0] * model.learning_rate)
+
+    if model.init_ == 'zero':
+        bias = 0.0
+    else:
+        prior = model.init_.class_prior_[1]
+        bias = np.log(prior / (1 - prior))
+    return builder.build('logit', bias=bias, n_features=model.n_features_in_, source=type(model).__name__)
+
+
+def _compile_xgboost(model):
+    config = json.loads(model.get_booster().save_raw(raw_format='json'))
+    learner = config['learner']
+    builder = _TreeBuilder()
+
+    for tree in learner['gradient_booster']['model']['trees']:
+        left = np.array(tree['left_children'])
+        right = np.array(tree['right_children'])
+        conditions = np.array(tree['split_conditions'], dtype=np.float32)
+        # XGBoost sends a row left when x < condition; leaves keep their weight in split_conditions
+        builder.add_tree(
+            feature=np.array(tree['split_indices']),
+            threshold=_float32_below(conditions),
+            left=left,
+            right=right,
+            value=conditions.astype(np.float64),
+            depth=_tree_depth(left, right)
+        )
+
+    base_score = float(str(learner['learner_model_param']['base_score']).strip('[]'))
+    bias = np.log(base_score / (1 - base_score))
+    return builder.build('logit', bias=bias, n_features=model.n_features_in_, source=type(model).__name__)
+
+
+def _compile_catboost(model):
+    handle, path = tempfile.mkstemp(suffix='.json')
+    os.close(handle)
+    try:
+        model.save_model(path, format='json')
+        with open(path) as f:
+            config = json.load(f)
+    finally:
+        os.remove(path)
+
+    flat_index = {
+        feature['feature_index']: feature['flat_feature_index']
+        for feature in config['features_info']['float_features']
+    }
+    scale, bias = config['scale_and_bias']
+    builder = _TreeBuilder()
+
+    for tree in config['oblivious_trees']:
+        splits = tree['splits']
+        depth = len(splits)
+        n_internal = 2 ** depth - 1
+
+        # Expand the oblivious tree into a complete binary tree: node i at level
+        # l tests splits[l]; leaf k takes leaf_values[k], where bit l of k is set
+        # when splits[l] sent the row right (x > border)
+        feature = np.zeros(2 * n_internal + 1, dtype=np.int64)
+        threshold = np.zeros(2 * n_internal + 1, dtype=np.float64)
+        left = np.full(2 * n_internal + 1, -1, dtype=np.int64)
+        right = np.full(2 * n_internal + 1, -1, dtype=np.int64)
+        value = np.zeros(2 * n_internal + 1, dtype=np.float64)
+
+        for node in range(n_internal):
+            level = int(np.log2(node + 1))
+            split = splits[level]
+            feature[node] = flat_index[split['float_feature_index']]
+            threshold[node] = split['border']
+            left[node] = 2 * node + 1
+            right[node] = 2 * node + 2
+
+        for leaf in range(n_internal + 1):
+            node = n_internal + leaf
+            # Heap position spells the path from the root, most significant bit first
+            path = leaf
+            index = 0
+            for level in range(depth):
+                went_right = (path >> (depth - 1 - level)) & 1
+                index |= went_right << level
+            value[node] = tree['leaf_values'][index] * scale
+
+        builder.add_tree(feature, _float32_at_most(threshold), left, right, value, depth)
+
+    return builder.build('logit', bias=float(np.sum(bias)), n_features=len(flat_index),
+                         source=type(model).__name__)
+
+
+def fold_scaler(compiled, scaler):
+    """
+    Rewrite split thresholds from scaled units back into raw feature units
+
+    Trees only compare one feature against a constant, and StandardScaler is
+    a per-feature increasing affine map, so (x - mean) / scale <= t exactly
+    when x <= t * scale + mean. The folded forest takes unscaled rows.
+    """
+    if compiled.raw_features:
+        raise ValueError('Scaler is already folded into this model')
+
+    mean = scaler.mean_ if scaler.with_mean else np.zeros(compiled.n_features)
+    scale = scaler.scale_ if scaler.with_std else np.ones(compiled.n_features)
+    is_leaf = compiled.left == np.arange(compiled.n_nodes)
+    # The libraries round the scaled value to float32 before comparing, and
+    # float32(y) <= t holds for every y up to halfway to the next float32
+    upper = np.nextafter(compiled.threshold, np.float32(np.inf))
+    edge = (compiled.threshold.astype(np.float64) + upper.astype(np.float64)) / 2
+    # Raw values span several orders of magnitude, so keep the folded thresholds in float64
+    threshold = edge * scale[compiled.feature] + mean[compiled.feature]
+
+    return CompiledForest(
+        feature=compiled.feature,
+        threshold=np.where(is_leaf, 0.0, threshold),
+        left=compiled.left,
+        right=compiled.right,
+        value=compiled.value,
+        roots=compiled.roots,
+        depth=compiled.depth,
+        aggregation=compiled.aggregation,
+        bias=compiled.bias,
+        n_features=compiled.n_features,
+        source=compiled.source,
+        raw_features=True
+    )
+
+
+def compile_model(model, scaler=None):
+    """
+    Compile a fitted tree model into a CompiledForest
+
+    Supports DecisionTreeClassifier, RandomForestClassifier,
+    GradientBoostingClassifier, XGBClassifier and CatBoostClassifier.
+    Raises TypeError for anything else. When the model was trained on
+    StandardScaler output, passing that scaler folds it into the thresholds.
+    """
+    kind = type(model).__name__
+    if kind in ('DecisionTreeClassifier', 'RandomForestClassifier', 'ExtraTreesClassifier'):
+        compiled = _compile_sklearn_forest(model)
+    elif kind == 'GradientBoostingClassifier':
+        compiled = _compile_sklearn_boosting(model)
+    elif kind == 'XGBClassifier':
+        compiled = _compile_xgboost(model)
+    elif kind == 'CatBoostClassifier':
+        compiled = _compile_catboost(model)
+    else:
+        raise TypeError(f'Cannot compile model of type {kind}')
+
+    if scaler is not None:
+        compiled = fold_scaler(compiled, scaler)
+    return compiled
+
+
+def verify_compiled(compiled, model, X, scaler=None):
+    """
+    Largest absolute difference between compiled and library fraud probabilities
+
+    X holds the library model's inputs, or raw rows when `scaler` is given
+    (the library model then sees scaler.transform(X)).
+    """
+    expected = model.predict_proba(X if scaler is None else scaler.transform(X))[:, 1]
+    actual = compiled.predict_proba(np.asarray(X))[:, 1]
+    return float(np.max(np.abs(expected - actual)))
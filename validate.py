@@ -124,17 +124,26 @@ def check_trained_models():
     """Check if all trained models exist"""
     print("\nChecking trained models...")
     
+    # Trained bundles live in models/<version>/, named by models/CURRENT
+    model_dir = 'models'
+    if os.path.exists('models/CURRENT'):
+        with open('models/CURRENT') as f:
+            model_dir = os.path.join('models', f.read().strip())
+        print_success(f"Current model version: {os.path.basename(model_dir)}")
+    
     required_models = [
-        'models/job_xgboost.pkl',
-        'models/job_catboost.pkl',
-        'models/job_gradient_boost.pkl',
-        'models/job_random_forest.pkl',
-        'models/job_decision_tree.pkl',
-        'models/job_scaler.pkl',
-        'models/internship_svm.pkl',
-        'models/internship_random_forest.pkl',
-        'models/internship_xgboost.pkl',
-        'models/internship_scaler.pkl',
+        os.path.join(model_dir, name) for name in [
+            'job_xgboost.pkl',
+            'job_catboost.pkl',
+            'job_gradient_boost.pkl',
+            'job_random_forest.pkl',
+            'job_decision_tree.pkl',
+            'job_scaler.pkl',
+            'internship_svm.pkl',
+            'internship_random_forest.pkl',
+            'internship_xgboost.pkl',
+            'internship_scaler.pkl',
+        ]
     ]
     
     all_exist = True
@@ -0,0 +1,33 @@
+"""
+Worker Memory
+Resident, proportional, shared and private memory of server processes, read
+from /proc, so copy-on-write sharing between pre-forked workers is visible
+"""
+
+
+def memory_usage(pid=None):
+    """
+    Memory of a process (this one by default) in bytes
+
+    pss_bytes charges each shared page to the processes mapping it in equal
+    parts, so summing it over the workers gives their real footprint.
+    Returns None where /proc/<pid>/smaps_rollup is unavailable.
+    """
+    try:
+        with open(f'/proc/{pid or "self"}/smaps_rollup') as f:
+            lines = f.readlines()
+    except OSError:
+        return None
+
+    values = {}
+    for line in lines:
+        parts = line.split()
+        if len(parts) == 3 and parts[2] == 'kB':
+            values[parts[0].rstrip(':')] = int(parts[1]) * 1024
+
+    return {
+        'rss_bytes': values.get('Rss', 0),
+        'pss_bytes': values.get('Pss', 0),
+        'shared_bytes': values.get('Shared_Clean', 0) + values.get('Shared_Dirty', 0),
+        'private_bytes': values.get('Private_Clean', 0) + values.get('Private_Dirty', 0)
+    }